@@ -0,0 +1,152 @@
+"""
+End-to-end scaling benchmark for both simulations.
+
+Sweeps agent counts for every fish mode (1/2/3) and bird mode (SCOUT/HUNT), runs each
+configuration headless and records the mean cost of every phase (grid build,
+WaterEffects.update, steering, integration, drawing...) per step.
+
+    python bench.py                         # full sweep -> bench_results.json
+    python bench.py --quick                 # small sweep for a smoke check
+    python bench.py --sim fish --counts 500 5000 50000 --steps 30 --out fish.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from headless import make_sim, parse_size
+
+FISH_COUNTS = [500, 1000, 2000, 5000, 10000, 20000, 50000]
+BIRD_COUNTS = [500, 1000, 2000, 5000, 10000, 20000]
+FISH_MODES = [1, 2, 3]
+BIRD_MODES = ["SCOUT", "HUNT"]
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def bench_one(sim_name, mode, agents, size, steps, warmup, render, skin=None, workers=None):
+    """Runs one configuration and returns its result record."""
+    width, height = size
+    sim = make_sim(sim_name, agents, width, height, mode, skin, workers)
+    canvas = pygame.Surface((width, height)) if render else None
+    try:
+        # 1. WARMUP: let the school/flock settle before timing (first frames are unrepresentative)
+        for _ in range(warmup):
+            sim.step()
+            if canvas is not None: sim.draw(canvas)
+
+        # 2. TIMED STEPS with the per-phase lap timer switched on
+        timer = sim.timer
+        timer.enabled = True
+        timer.reset()
+        step_times = []
+        for _ in range(steps):
+            start = time.perf_counter()
+            timer.begin()
+            sim.step()
+            if canvas is not None: sim.draw(canvas)
+            step_times.append(time.perf_counter() - start)
+        timer.enabled = False
+
+        phases = timer.averages_ms()
+        step_ms = np.array(step_times) * 1000.0
+        return {
+            "sim": sim_name,
+            "mode": mode,
+            "agents": agents,
+            "steps": steps,
+            "ms_per_step": float(step_ms.mean()),
+            "p95_ms": float(np.percentile(step_ms, 95)),
+            "steps_per_sec": float(1000.0 / step_ms.mean()),
+            "drawing_ms": float(sum(ms for name, ms in phases.items() if name.endswith("draw"))),
+            "phases_ms": {name: float(ms) for name, ms in phases.items()},
+            "neighbor_list": sim.neighbor_stats(),
+            "tiles": sim.tile_stats() if sim_name == "fish" else None,
+        }
+    finally:
+        sim.close()
+
+def sweep(sims, fish_counts, bird_counts, size, steps, warmup, render, budget_ms, skin=None, workers=None):
+    """
+    Yields result records for every (sim, mode, count). Once a configuration is slower than
+    budget_ms per step, larger counts for that mode are skipped: past the knee they only burn time.
+    """
+    plan = []
+    if "fish" in sims: plan += [("fish", mode, fish_counts) for mode in FISH_MODES]
+    if "bird" in sims: plan += [("bird", mode, bird_counts) for mode in BIRD_MODES]
+
+    for sim_name, mode, counts in plan:
+        for agents in sorted(counts):
+            record = bench_one(sim_name, mode, agents, size, steps, warmup, render, skin, workers)
+            yield record
+            if budget_ms and record["ms_per_step"] > budget_ms:
+                break
+
+def print_row(record):
+    phases = "  ".join(f"{name}={ms:.2f}" for name, ms in sorted(record["phases_ms"].items()))
+    print(f"{record['sim']:>4} {str(record['mode']):>5} {record['agents']:>7}  "
+          f"{record['ms_per_step']:9.2f} ms  {record['steps_per_sec']:8.1f}/s  | {phases}", flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bio-Sim scaling benchmark.")
+    parser.add_argument("--sim", choices=["fish", "bird", "both"], default="both")
+    parser.add_argument("--counts", type=int, nargs="+", default=None, help="override agent counts for every sim")
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="WIDTHxHEIGHT")
+    parser.add_argument("--steps", type=int, default=60, help="timed steps per configuration")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--no-render", dest="render", action="store_false", help="skip the off-screen draw")
+    parser.add_argument("--budget-ms", type=float, default=2000.0,
+                        help="stop growing a mode's agent count once a step costs more than this (0 = never)")
+    parser.add_argument("--skin", type=float, default=None, help="Verlet neighbor-list skin in px (0 = off)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="fish: step the school in this many processes, one world tile each (0 = off)")
+    parser.add_argument("--quick", action="store_true", help="tiny sweep: 1/10/500/2000 agents, 10 steps")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    fish_counts = args.counts or FISH_COUNTS
+    bird_counts = args.counts or BIRD_COUNTS
+    if args.quick:
+        # 1 and 10 agents: schools too sparse for any neighbor pair, which the vector paths must survive
+        fish_counts = bird_counts = [1, 10, 500, 2000]
+        args.steps, args.warmup = 10, 2
+    sims = ["fish", "bird"] if args.sim == "both" else [args.sim]
+
+    results = []
+    for record in sweep(sims, fish_counts, bird_counts, args.size, args.steps, args.warmup, args.render, args.budget_ms, args.skin, args.workers):
+        print_row(record)
+        results.append(record)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "resolution": list(args.size),
+        "render": args.render,
+        "skin": args.skin,
+        "workers": args.workers,
+        "results": results,
+    }
+    with open(args.out, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {len(results)} results to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,17 @@
 import math
 import random
+import numpy as np
 import pygame
+import constants
+from spatial import CellIndex, NeighborList
+from lod import LevelOfDetail
+from sprites import SpriteAtlas
+from vecmath import clamp_length, normalized, steer
 
 class boid():
+    # WaterEffects splats sharks' wakes over 3x3 cells instead of one
+    is_shark = False
+
     def __init__(self,x,y):
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(random.uniform(-1, 1), random.uniform(-1, 1))
@@ -149,123 +158,70 @@ class Fish(boid):
         # Frequency: Randomize how fast the tail wags (e.g., 0.015 to 0.025)
         self.sway_speed = random.uniform(0.015, 0.025)
 
-    def draw(self, screen):
+    def draw(self, screen, ticks):
+        """`ticks` is the animation clock in ms (FishSim.animation_ms) that drives the tail sway."""
         if self.velocity.length() > 0.1:
-            # --- THE ONE-LINE SCALE ---
-            # Increased to 1.8 for a "slightly bigger" feel
-            scale = 0.9
-
-            # 1. Orientation Math
-            forward = self.velocity.normalize()
-            side = pygame.Vector2(-forward.y, forward.x)
-
-            # 2. Procedural Tail Sway (Slightly faster frequency than the shark)
-            t = pygame.time.get_ticks()
-            sway_val = math.sin(t * self.sway_speed + self.sway_offset)
-            sway = sway_val * (6 * scale)
-
-            # 3. Defining Points for a "Fishy" Silhouette
-            nose = self.position + forward * (12 * scale)
-
-            # Upper/Lower Body (The "girth" of the fish)
-            upper_mid = self.position + forward * (2 * scale) + side * (5 * scale)
-            lower_mid = self.position + forward * (2 * scale) - side * (5 * scale)
-
-            # Tail Peduncle (The narrow bit before the fin)
-            tail_base = self.position - forward * (8 * scale)
-
-            # Caudal Fin (Tail) with Sway
-            tail_top = self.position - forward * (16 * scale) + side * (7 * scale + sway)
-            tail_bot = self.position - forward * (16 * scale) - side * (7 * scale - sway)
-            tail_notch = self.position - forward * (12 * scale)
-
-            # 4. Color Palette (Silvery Salmon Blue)
-            BODY_COLOR = (140, 165, 190)
-            DARK_BACK = (90, 110, 130)
-
-            # 5. DRAWING THE LAYERS
-
-            # Layer 1: Main Body Shape
-            fish_points = [
-                nose,
-                upper_mid,
-                tail_base + side * (2 * scale),
-                tail_top,
-                tail_notch,
-                tail_bot,
-                tail_base - side * (2 * scale),
-                lower_mid
-            ]
-            pygame.draw.polygon(screen, BODY_COLOR, fish_points)
-
-            # Layer 2: Darker Top/Back (Countershading)
-            back_points = [
-                nose,
-                upper_mid,
-                tail_base + side * (1 * scale),
-                self.position - forward * (4 * scale)
-            ]
-            pygame.draw.polygon(screen, DARK_BACK, back_points)
-
-            # Layer 3: Tiny Eye
-            eye_pos = self.position + forward * (8 * scale) + side * (2 * scale)
-            pygame.draw.circle(screen, (30, 30, 40), (int(eye_pos.x), int(eye_pos.y)), int(1 * scale))
-
-    def update(self, grid, cell_size):
-        # 1. SPATIAL LOOKUP: Get only neighbors in a 3x3 grid area
-        neighbors = []
-        grid_x = int(self.position.x // cell_size)
-        grid_y = int(self.position.y // cell_size)
-
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                key = (grid_x + dx, grid_y + dy)
-                if key in grid:
-                    neighbors.extend(grid[key])
-
-        # 2. RUN STEERING LOGIC
-        # Pass the filtered neighbors list instead of the whole school
-        align_force = self.alignment(neighbors)
-        # (Repeat for separation and cohesion if you have them)
-        self.acceleration += align_force
-
-        # 3. PHYSICS INTEGRATION (Your original logic)
-        if self.acceleration.length() > self.max_force:
-            self.acceleration.scale_to_length(self.max_force)
-
-        self.velocity += self.acceleration
-
-        if self.velocity.length() > self.max_speed:
-            self.velocity.scale_to_length(self.max_speed)
-
-        self.position += self.velocity
-        self.acceleration *= 0
-
-    def alignment(self, neighbors):
-        perception_radius_sq = 2500 # 50^2 - Squared to avoid sqrt math
-        steering = pygame.Vector2(0, 0)
-        total = 0
-
-        for other in neighbors:
-            if other is not self:
-                # Vector from other to self
-                diff = self.position - other.position
-                # Using length_squared() is much faster than distance_to()
-                if diff.length_squared() < perception_radius_sq:
-                    steering += other.velocity
-                    total += 1
-
-        if total > 0:
-            steering /= total
-            if steering.length() > 0:
-                steering.scale_to_length(self.max_speed)
-                steering -= self.velocity
-                if steering.length() > self.max_force:
-                    steering.scale_to_length(self.max_force)
-
-        return steering
+            # One pre-rendered frame for this heading + tail phase (see FISH_SPRITES)
+            FISH_SPRITES.draw(screen, [self.position], [math.atan2(self.velocity.y, self.velocity.x)],
+                              [ticks * self.sway_speed + self.sway_offset])
+
+    @staticmethod
+    def draw_shape(screen, position, forward, side, sway_val, scale=0.9, variant=0):
+        """The fish silhouette facing `forward`, tail at sway_val (-1..1). Renders FISH_SPRITES frames."""
+        # 2. Procedural Tail Sway (Slightly faster frequency than the shark)
+        sway = sway_val * (6 * scale)
+
+        # 3. Defining Points for a "Fishy" Silhouette
+        nose = position + forward * (12 * scale)
+
+        # Upper/Lower Body (The "girth" of the fish)
+        upper_mid = position + forward * (2 * scale) + side * (5 * scale)
+        lower_mid = position + forward * (2 * scale) - side * (5 * scale)
+
+        # Tail Peduncle (The narrow bit before the fin)
+        tail_base = position - forward * (8 * scale)
+
+        # Caudal Fin (Tail) with Sway
+        tail_top = position - forward * (16 * scale) + side * (7 * scale + sway)
+        tail_bot = position - forward * (16 * scale) - side * (7 * scale - sway)
+        tail_notch = position - forward * (12 * scale)
+
+        # 4. Color Palette (Silvery Salmon Blue)
+        BODY_COLOR = (140, 165, 190)
+        DARK_BACK = (90, 110, 130)
+
+        # 5. DRAWING THE LAYERS
+
+        # Layer 1: Main Body Shape
+        fish_points = [
+            nose,
+            upper_mid,
+            tail_base + side * (2 * scale),
+            tail_top,
+            tail_notch,
+            tail_bot,
+            tail_base - side * (2 * scale),
+            lower_mid
+        ]
+        pygame.draw.polygon(screen, BODY_COLOR, fish_points)
+
+        # Layer 2: Darker Top/Back (Countershading)
+        back_points = [
+            nose,
+            upper_mid,
+            tail_base + side * (1 * scale),
+            position - forward * (4 * scale)
+        ]
+        pygame.draw.polygon(screen, DARK_BACK, back_points)
+
+        # Layer 3: Tiny Eye
+        eye_pos = position + forward * (8 * scale) + side * (2 * scale)
+        pygame.draw.circle(screen, (30, 30, 40), (int(eye_pos.x), int(eye_pos.y)), int(1 * scale))
 
 class PredatorFish(Fish):
+    is_shark = True
+    water_drag = 0.01   # Heavy body: the current barely moves it
+
     def __init__(self, x, y):
         super().__init__(x, y)
         self.scale = 1.0
@@ -279,101 +235,97 @@ class PredatorFish(Fish):
         self.cruise_speed = 3.0
         self.max_burst_speed = 9.0
 
-    def draw(self, screen):
+    def draw(self, screen, ticks):
         if self.velocity.length() > 0.1:
-            # --- ONE-LINE SCALE ---
-            scale = 1.5  # Change this to 1.5, 2.0, etc., to resize everything
-
-            # 1. Orientation Math
-            forward = self.velocity.normalize()
-            side = pygame.Vector2(-forward.y, forward.x)
-
-            # 2. Procedural Tail Sway (Scaled sway magnitude)
+            # One pre-rendered frame per heading + tail phase; bursting sharks wag faster and wider
             sway_speed = 0.02 if self.is_bursting else 0.012
-            sway_mag = 25 if self.is_bursting else 15
-            t = pygame.time.get_ticks()
-            sway = math.sin(t * sway_speed + self.sway_offset) * (sway_mag * scale)
-
-            # 3. Defining Points (All offsets multiplied by scale)
-            nose = self.position + forward * (60 * scale)
-
-            # Pectoral Fins
-            pec_l = self.position + forward * (5 * scale) + side * (30 * scale + sway * 0.3)
-            pec_r = self.position + forward * (5 * scale) - side * (30 * scale + sway * 0.3)
-            pec_root_l = self.position + forward * (15 * scale) + side * (12 * scale)
-            pec_root_r = self.position + forward * (15 * scale) - side * (12 * scale)
-
-            # Thick Tail Section (Peduncle)
-            tail_mid = self.position - forward * (15 * scale)
-
-            # 4. Caudal Fin
-            tail_tip_top = self.position - forward * (65 * scale) + side * (25 * scale + sway)
-            tail_tip_bot = self.position - forward * (65 * scale) - side * (25 * scale - sway)
-            tail_notch = self.position - forward * (50 * scale)
-
-            # --- DORSAL FIN POINTS ---
-            dorsal_base_start = self.position + forward * (10 * scale)
-            dorsal_tip = self.position - forward * (5 * scale) + side * (4 * scale)
-            dorsal_base_end = self.position - forward * (15 * scale)
-
-            # COLOR PALETTE
-            BROWN_GREY = (90, 85, 80)
-            UNDERBELLY = (55, 50, 45)
-            DARK_SPINE = (45, 42, 40)
-
-            # LAYER 1: Pectoral Fins
-            pygame.draw.polygon(screen, BROWN_GREY, [pec_root_l, pec_l, self.position + side * (5 * scale)])
-            pygame.draw.polygon(screen, BROWN_GREY, [pec_root_r, pec_r, self.position - side * (5 * scale)])
-
-            # LAYER 2: The Main Body & Tail
-            body_points = [
-                nose, pec_root_r,
-                tail_mid - side * (15 * scale),
-                tail_tip_top, tail_notch, tail_tip_bot,
-                tail_mid + side * (15 * scale),
-                pec_root_l
-            ]
-            pygame.draw.polygon(screen, UNDERBELLY, body_points)
-
-            # LAYER 3: Countershading
-            spine_points = [
-                self.position + forward * (45 * scale),
-                self.position + forward * (10 * scale) + side * (12 * scale),
-                tail_mid + side * (6 * scale),
-                self.position - forward * (50 * scale) + side * (sway * 0.5),
-                tail_mid - side * (6 * scale),
-                self.position + forward * (10 * scale) - side * (12 * scale)
-            ]
-            pygame.draw.polygon(screen, DARK_SPINE, spine_points)
-
-            # --- LAYER 4: DORSAL FIN DRAW ---
-            pygame.draw.polygon(screen, DARK_SPINE, [dorsal_base_start, dorsal_tip, dorsal_base_end])
-
-            # 5. Detail: Red Eye
-            eye_dist_forward = 35 * scale  # How far toward the nose
-            eye_dist_side = 4 * scale     # How far from the center spine (Keep this small!)
-
-            eye_pos1 = self.position + (forward * eye_dist_forward) + (side * eye_dist_side)
-            eye_pos2 = self.position + (forward * eye_dist_forward) - (side * eye_dist_side)
-
-            # 3. Draw with a small "Socket" or "Shadow"
-            # Draw a slightly larger dark circle first to act as a socket
-            pygame.draw.circle(screen, (20, 30, 50), (int(eye_pos1.x), int(eye_pos1.y)), int(2.5 * scale))
-            pygame.draw.circle(screen, (20, 30, 50), (int(eye_pos2.x), int(eye_pos2.y)), int(2.5 * scale))
-
-            # Draw the actual glowing red eye on top
-            pygame.draw.circle(screen, (238, 75, 43), (int(eye_pos1.x), int(eye_pos1.y)), int(1.5 * scale))
-            pygame.draw.circle(screen, (238, 75, 43), (int(eye_pos2.x), int(eye_pos2.y)), int(1.5 * scale))
+            SHARK_SPRITES.draw(screen, [self.position], [math.atan2(self.velocity.y, self.velocity.x)],
+                               [ticks * sway_speed + self.sway_offset], [int(self.is_bursting)])
+
+    @staticmethod
+    def draw_shape(screen, position, forward, side, sway_val, scale=1.5, variant=0):
+        """The shark silhouette facing `forward`; variant 1 is the wider bursting tail sway."""
+        # 2. Procedural Tail Sway (Scaled sway magnitude)
+        sway_mag = 25 if variant else 15
+        sway = sway_val * (sway_mag * scale)
+
+        # 3. Defining Points (All offsets multiplied by scale)
+        nose = position + forward * (60 * scale)
+
+        # Pectoral Fins
+        pec_l = position + forward * (5 * scale) + side * (30 * scale + sway * 0.3)
+        pec_r = position + forward * (5 * scale) - side * (30 * scale + sway * 0.3)
+        pec_root_l = position + forward * (15 * scale) + side * (12 * scale)
+        pec_root_r = position + forward * (15 * scale) - side * (12 * scale)
+
+        # Thick Tail Section (Peduncle)
+        tail_mid = position - forward * (15 * scale)
+
+        # 4. Caudal Fin
+        tail_tip_top = position - forward * (65 * scale) + side * (25 * scale + sway)
+        tail_tip_bot = position - forward * (65 * scale) - side * (25 * scale - sway)
+        tail_notch = position - forward * (50 * scale)
+
+        # --- DORSAL FIN POINTS ---
+        dorsal_base_start = position + forward * (10 * scale)
+        dorsal_tip = position - forward * (5 * scale) + side * (4 * scale)
+        dorsal_base_end = position - forward * (15 * scale)
+
+        # COLOR PALETTE
+        BROWN_GREY = (90, 85, 80)
+        UNDERBELLY = (55, 50, 45)
+        DARK_SPINE = (45, 42, 40)
+
+        # LAYER 1: Pectoral Fins
+        pygame.draw.polygon(screen, BROWN_GREY, [pec_root_l, pec_l, position + side * (5 * scale)])
+        pygame.draw.polygon(screen, BROWN_GREY, [pec_root_r, pec_r, position - side * (5 * scale)])
+
+        # LAYER 2: The Main Body & Tail
+        body_points = [
+            nose, pec_root_r,
+            tail_mid - side * (15 * scale),
+            tail_tip_top, tail_notch, tail_tip_bot,
+            tail_mid + side * (15 * scale),
+            pec_root_l
+        ]
+        pygame.draw.polygon(screen, UNDERBELLY, body_points)
+
+        # LAYER 3: Countershading
+        spine_points = [
+            position + forward * (45 * scale),
+            position + forward * (10 * scale) + side * (12 * scale),
+            tail_mid + side * (6 * scale),
+            position - forward * (50 * scale) + side * (sway * 0.5),
+            tail_mid - side * (6 * scale),
+            position + forward * (10 * scale) - side * (12 * scale)
+        ]
+        pygame.draw.polygon(screen, DARK_SPINE, spine_points)
+
+        # --- LAYER 4: DORSAL FIN DRAW ---
+        pygame.draw.polygon(screen, DARK_SPINE, [dorsal_base_start, dorsal_tip, dorsal_base_end])
+
+        # 5. Detail: Red Eye
+        eye_dist_forward = 35 * scale  # How far toward the nose
+        eye_dist_side = 4 * scale     # How far from the center spine (Keep this small!)
+
+        eye_pos1 = position + (forward * eye_dist_forward) + (side * eye_dist_side)
+        eye_pos2 = position + (forward * eye_dist_forward) - (side * eye_dist_side)
+
+        # 3. Draw with a small "Socket" or "Shadow"
+        # Draw a slightly larger dark circle first to act as a socket
+        pygame.draw.circle(screen, (20, 30, 50), (int(eye_pos1.x), int(eye_pos1.y)), int(2.5 * scale))
+        pygame.draw.circle(screen, (20, 30, 50), (int(eye_pos2.x), int(eye_pos2.y)), int(2.5 * scale))
+
+        # Draw the actual glowing red eye on top
+        pygame.draw.circle(screen, (238, 75, 43), (int(eye_pos1.x), int(eye_pos1.y)), int(1.5 * scale))
+        pygame.draw.circle(screen, (238, 75, 43), (int(eye_pos2.x), int(eye_pos2.y)), int(1.5 * scale))
 
     def hunt(self, school):
         if not school:
             return pygame.Vector2(0, 0)
 
-        # 1. Find the school's center manually
-        avg_pos = pygame.Vector2(0, 0)
-        for fish in school:
-            avg_pos += fish.position
-        center = avg_pos / len(school)
+        # 1. Find the school's center (one mean over the FishSchool position array)
+        center = school.center()
 
         # 2. Vector to center
         to_center = center - self.position
@@ -429,19 +381,11 @@ class PredatorFish(Fish):
         return pygame.Vector2(0, 0)
 
         # In PredatorFish class
-    def update(self, mode, grid, cell_size):
+    def update(self, mode, prey_index):
         # 1. SPATIAL TARGETING (Vision)
         # The predator checks its current cell + neighbors to find prey
-        possible_prey = []
-        grid_x = int(self.position.x // cell_size)
-        grid_y = int(self.position.y // cell_size)
-
         # Predators usually have better vision, so we check a 5x5 grid (range -2 to 2)
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                key = (grid_x + dx, grid_y + dy)
-                if key in grid:
-                    possible_prey.extend(grid[key])
+        prey_nearby = prey_index.count_near(self.position, 2)
 
         # 2. BURST & HUNT LOGIC
         self.next_burst_time -= 1
@@ -457,7 +401,7 @@ class PredatorFish(Fish):
 
             # Trigger burst if prey is detected in the local grid
             if mode == 2 and self.next_burst_time <= 0:
-                if possible_prey: # Only burst if there's actually fish nearby
+                if prey_nearby: # Only burst if there's actually fish nearby
                     self.is_bursting = True
                     self.burst_timer = 60
                     self.max_speed = 7
@@ -523,4 +467,217 @@ class PredatorFish(Fish):
                 if steering.length() > max_force:
                     steering.scale_to_length(max_force)
 
-        return steering
\ No newline at end of file
+        return steering
+
+# Pre-rendered frames (see sprites.SpriteAtlas). Extents are each silhouette's reach at scale 1:
+# the fish's swaying tail tip, the shark's tail tip at full burst sway
+FISH_SPRITES = SpriteAtlas(Fish.draw_shape, extent=21, headings=64, phases=16, scale=0.9,
+                           max_bytes=constants.SPRITE_CACHE_MB << 20)
+SHARK_SPRITES = SpriteAtlas(PredatorFish.draw_shape, extent=83, headings=96, phases=16, scale=1.5,
+                            max_bytes=constants.SPRITE_CACHE_MB << 20)
+# Cheaper tiers for big schools: nose to tail fin is 28 units, the triangle is the slim body
+FISH_LOD = LevelOfDetail((140, 165, 190), [(12, 0), (-14, 4), (-14, -4)], length=28,
+                         dense_color=(90, 110, 130))
+
+class FishSchool:
+    """
+    Array-backed school of Fish. Every fish is one row in contiguous float arrays,
+    so steering, clamping and bounce_edges run for the whole school at once.
+    Behavior mirrors the per-fish boid.separation/cohesion + alignment loop it replaced,
+    plus fish_main's mode forces.
+    """
+    SEPARATION_RADIUS = 25
+    PERCEPTION_RADIUS = 50  # Cohesion + Alignment
+    EDGE_MARGIN = 50
+    WATER_DRAG = 0.02       # Pull toward the local water flow, per frame
+
+    # (separation, cohesion, alignment) weights used by fish_main for each mode
+    MODE_WEIGHTS = {1: (1.5, 0.3, 0.8), 2: (10.0, 0.5, 1.0), 3: (50.0, 25.0, 3.0)}
+
+    def __init__(self, count, width, height, skin=0):
+        """skin > 0 serves neighbors from a Verlet NeighborList with that margin (px)."""
+        self.rng = np.random.default_rng()
+        self.positions = np.column_stack((self.rng.integers(0, width, count, endpoint=True),
+                                          self.rng.integers(0, height, count, endpoint=True))).astype(np.float64)
+        self.velocities = self.rng.uniform(-1, 1, (count, 2))
+        self.accelerations = np.zeros((count, 2))
+
+        # Same defaults as Fish.__init__
+        self.max_speed = 3
+        self.max_force = 0.15
+        self.sway_offset = self.rng.uniform(0, math.pi * 2, count)
+        self.sway_speed = self.rng.uniform(0.015, 0.025, count)
+        self.index = CellIndex(self.PERCEPTION_RADIUS, (0, 0, width, height))
+        # Separation (25px) and cohesion/alignment (50px) are both served from the 50px list
+        self.neighbor_list = NeighborList(self.PERCEPTION_RADIUS, skin, (0, 0, width, height)) if skin else None
+        self.steered = None   # Steer only the first `steered` fish (None: all of them)
+
+    @classmethod
+    def view(cls, positions, velocities, accelerations, bounds, rng=None):
+        """
+        A school over existing arrays instead of a fresh random spawn: steering and integration
+        act on (and write into) the arrays given. Used for the tiled stepper's per-tile working sets.
+        """
+        school = cls.__new__(cls)
+        school.rng = rng if rng is not None else np.random.default_rng()
+        school.positions, school.velocities, school.accelerations = positions, velocities, accelerations
+        school.max_speed, school.max_force = 3, 0.15
+        school.sway_offset = school.sway_speed = None
+        school.index = CellIndex(cls.PERCEPTION_RADIUS, bounds)
+        school.neighbor_list = None
+        school.steered = None
+        return school
+
+    def __len__(self):
+        return len(self.positions)
+
+    def close(self):
+        """Nothing to release here; tiles.TiledSchool shuts its worker pool and shared memory down."""
+
+    def set_limits(self, max_speed, max_force):
+        self.max_speed, self.max_force = max_speed, max_force
+
+    def center(self):
+        return pygame.Vector2(*self.positions.mean(axis=0))
+
+    def find_neighbors(self):
+        """Files the fish into the grid (or the Verlet list) for this frame's steering."""
+        if self.neighbor_list is not None:
+            self.neighbor_list.update(self.positions)
+            return
+        self.index.update(self.positions)
+
+    def pair_blocks(self):
+        """This frame's candidate (i, j) pairs (3x3 cells of PERCEPTION_RADIUS), in blocks of
+        consecutive fish: the cached Verlet blocks, or generated one block at a time."""
+        if self.neighbor_list is not None:
+            return self.neighbor_list.blocks
+        return self.index.pair_blocks(1, self.steered)
+
+    def flocking_forces(self):
+        """
+        Separation, cohesion and alignment for every fish from one fused neighbor pass:
+        each candidate pair is gathered and measured once, and the only square roots are
+        the ones separation needs to normalize its < 25px offsets. The pairs come in bounded
+        blocks whose sums add up in the per-fish totals, so a dense school never holds them all.
+        """
+        pos, vel = self.positions, self.velocities
+        count = len(pos)
+        x, y = pos[:, 0].copy(), pos[:, 1].copy()
+        vx, vy = vel[:, 0].copy(), vel[:, 1].copy()
+        total, sep_total = np.zeros(count, dtype=np.intp), np.zeros(count, dtype=np.intp)
+        sep, coh, ali = np.zeros((count, 2)), np.zeros((count, 2)), np.zeros((count, 2))
+
+        for i, j in self.pair_blocks():
+            # 1. ONE DISTANCE PASS: 1D column gathers are far cheaper than (N, 2) row gathers
+            dx = x.take(i) - x.take(j)
+            dy = y.take(i) - y.take(j)
+            d_sq = dx * dx + dy * dy
+            near = d_sq < self.PERCEPTION_RADIUS ** 2
+            i, j, dx, dy, d_sq = i[near], j[near], dx[near], dy[near], d_sq[near]
+            total += np.bincount(i, minlength=count)
+
+            # 2. SEPARATION: unit vectors pointing away from close fish
+            close = d_sq < self.SEPARATION_RADIUS ** 2
+            si, sdx, sdy = i[close], dx[close], dy[close]
+            d = np.sqrt(d_sq[close])
+            # EPSILON SHIELD: stacked fish get a tiny random shove instead of a division by zero
+            stacked = d < 0.001
+            d[stacked] = 1.0
+            sdx /= d
+            sdy /= d
+            if stacked.any():
+                jitter = self.rng.uniform(-0.1, 0.1, (int(stacked.sum()), 2))
+                sdx[stacked], sdy[stacked] = jitter[:, 0], jitter[:, 1]
+            sep_total += np.bincount(si, minlength=count)
+            sep[:, 0] += np.bincount(si, sdx, count)
+            sep[:, 1] += np.bincount(si, sdy, count)
+
+            # 3. COHESION reuses the offsets: mean(x_j) - x_i == -mean(x_i - x_j), no second gather
+            coh[:, 0] += np.bincount(i, dx, count)
+            coh[:, 1] += np.bincount(i, dy, count)
+
+            # 4. ALIGNMENT is the only term that still reads the neighbors' rows
+            ali[:, 0] += np.bincount(i, vx.take(j), count)
+            ali[:, 1] += np.bincount(i, vy.take(j), count)
+
+        has_any = total > 0
+        safe_total = np.maximum(total, 1)[:, None]
+        # Separation is the average of the unit vectors
+        has_sep = sep_total > 0
+        sep[has_sep] /= sep_total[has_sep, None]
+        # ZERO-LENGTH SHIELD
+        tiny = has_sep & (np.einsum("ij,ij->i", sep, sep) < 0.0001)
+        sep[tiny] = self.rng.uniform(-0.1, 0.1, (int(tiny.sum()), 2))
+        sep = steer(sep, has_sep, vel, self.max_speed, self.max_force)
+        coh = steer(coh / -safe_total, has_any, vel, self.max_speed, self.max_force)
+        ali = steer(ali / safe_total, has_any, vel, self.max_speed, self.max_force)
+        return sep, coh, ali
+
+    def drag(self, flow):
+        """Fluid drag from the water velocity `flow` (N, 2) sampled under every fish."""
+        self.accelerations += (flow - self.velocities) * self.WATER_DRAG
+
+    def mode_forces(self, mode, predator_xy, center, flee_radius):
+        """fish_main's per-mode extras: fleeing the sharks at `predator_xy` (mode 2) or the FISHNADO vortex (mode 3)."""
+        pos, vel = self.positions, self.velocities
+        flee = np.zeros_like(pos)
+        if mode == 2:
+            for xy in predator_xy:
+                away = pos - xy
+                in_range = np.einsum("ij,ij->i", away, away) < flee_radius ** 2
+                flee[in_range] += normalized(away[in_range]) * (self.max_speed * 1.5) - vel[in_range]
+        elif mode == 3:
+            to_center = np.array((center.x, center.y)) - pos
+            orbit = np.column_stack((-to_center[:, 1], to_center[:, 0]))
+            flee = normalized(orbit) * (self.max_speed * 0.8) + normalized(to_center) * 2
+        return flee
+
+    def steer(self, mode, predators, center, flee_radius):
+        """Accumulates this frame's steering into accelerations (needs find_neighbors first)."""
+        self.steer_from(mode, [(p.position.x, p.position.y) for p in predators], center, flee_radius)
+
+    def steer_from(self, mode, predator_xy, center, flee_radius):
+        """steer() with the sharks given as (x, y) positions, for callers without PredatorFish objects."""
+        sep_w, coh_w, ali_w = self.MODE_WEIGHTS[mode]
+        sep, coh, ali = self.flocking_forces()
+
+        # The per-fish loop applied alignment once more on top of the weighted term
+        self.accelerations += self.mode_forces(mode, predator_xy, center, flee_radius) * 2.0
+        self.accelerations += sep * sep_w + coh * coh_w + ali * (ali_w + 1.0)
+
+    def integrate(self, width, height):
+        clamp_length(self.accelerations, self.max_force)
+        self.velocities += self.accelerations
+        clamp_length(self.velocities, self.max_speed)
+        self.positions += self.velocities
+        self.accelerations[:] = 0
+
+        self.bounce_edges(width, height)
+
+    def update(self, mode, predators, center, flee_radius, width, height):
+        self.find_neighbors()
+        self.steer(mode, predators, center, flee_radius)
+        self.integrate(width, height)
+
+    def bounce_edges(self, width, height):
+        margin = self.EDGE_MARGIN
+        for axis, limit in ((0, width), (1, height)):
+            coord = self.positions[:, axis]
+            out = (coord < margin) | (coord > limit - margin)
+            self.velocities[out, axis] *= -1
+            np.clip(coord, margin, limit - margin, out=coord)
+
+    def draw(self, screen, ticks, scale=0.9):
+        # Fish.draw's pre-rendered frames, all blitted in one call (a new scale re-renders them)
+        moving = np.einsum("ij,ij->i", self.velocities, self.velocities) > 0.01
+        if not moving.any():
+            return
+        FISH_SPRITES.set_scale(scale)
+        positions, vel = self.positions[moving], self.velocities[moving]
+        angles = np.arctan2(vel[:, 1], vel[:, 0])
+        phases = ticks * self.sway_speed[moving] + self.sway_offset[moving]
+        forwards = np.column_stack((np.cos(angles), np.sin(angles)))
+        # Big schools: triangles, pixels or a heatmap where a silhouette wouldn't show (see lod.py)
+        FISH_LOD.draw(screen, positions, forwards, scale,
+                      lambda k: FISH_SPRITES.draw(screen, positions[k], angles[k], phases[k]), total=len(self))
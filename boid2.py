@@ -1,6 +1,11 @@
 import math
 import random
+import numpy as np
 import pygame
+from lod import LevelOfDetail
+from silhouette import Silhouette
+from spatial import CellIndex, NeighborList
+from vecmath import clamp_length, lengths, normalized
 
 class Bird:
     def __init__(self, x, y):
@@ -20,191 +25,272 @@ class Bird:
     def apply_force(self, force):
         self.acceleration += force
 
-    def update(self, WIDTH, HEIGHT, grid, cell_size, flock_center, is_targeted, predator):
-        # 1. INITIALIZE PERSISTENT ATTRIBUTES
-        if not hasattr(self, 'panic_timer'): self.panic_timer = 0
-        if not hasattr(self, 'panic_dir'): self.panic_dir = pygame.Vector2(0, 0)
-
-        # 2. SPATIAL NEIGHBOR LOOKUP (Replaces the loop through all birds)
-        neighbors = []
-        grid_x = int(self.position.x // cell_size)
-        grid_y = int(self.position.y // cell_size)
-
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                key = (grid_x + dx, grid_y + dy)
-                if key in grid:
-                    neighbors.extend(grid[key])
-
-        # 3. SETUP VECTORS & OPTIMIZED NEIGHBOR LOOP
-        sep = pygame.Vector2(0, 0)
-        ali = pygame.Vector2(0, 0)
-        coh = pygame.Vector2(0, 0)
-        neighbor_count = 0
-        radius_sq = cell_size ** 2 # 220^2 pre-calculated
-
-        for other in neighbors:
-            if other != self:
-                dist_vec = self.position - other.position
-                d_sq = dist_vec.length_squared()
-
-                if 0 < d_sq < radius_sq:
-                    d = math.sqrt(d_sq)
-                    # HARD COLLISION
-                    if d < 42:
-                        nudge = dist_vec.normalize() * (42 - d) * 0.6
-                        self.position += nudge
-                        # Note: other.position -= nudge is removed here because
-                        # 'other' will eventually update itself, preventing double-nudging.
-
-                    sep += dist_vec.normalize() * (cell_size - d)
-                    sep = sep/1.5
-                    ali += other.velocity
-                    coh += other.position
-                    neighbor_count += 1
-
-        # 4. BOILING LOGIC
-        if neighbor_count > 0:
-            if ali.length_squared() > 0:
-                ali = ali.normalize() * 1.8
-
-            coh_vec = (coh / neighbor_count) - self.position
-            if coh_vec.length_squared() > 0:
-                coh = coh_vec.normalize() * 3.5
-
-            t = pygame.time.get_ticks() * 0.002
-            pulse = math.sin(t * 0.5 + self.position.x * 0.01) * 3.0
-            swirl_force = pygame.Vector2(math.cos(t), math.sin(t)) * (2.0 + pulse)*20
-
-            self.apply_force(sep * 2.2 + ali + coh + swirl_force)
-
-        # 5. TARGETED / HAYWIRE LOGIC
-        if is_targeted:
-            self.max_speed, self.max_force = 36.0, 6.0
-            self.flap_speed = 0.34
-            pull_back = pygame.Vector2(0, 0)
-            exit_flock = (self.position - flock_center).normalize() * random.randint(200,300)
-            to_predator = self.position - predator.position
-            flee = to_predator.normalize() * 25.0 if to_predator.length_squared() > 0 else pygame.Vector2(0,0)
-            self.apply_force(flee + self.panic_dir + exit_flock)
-
-            # Avoid division by zero if bird is exactly at flock center
-            to_center = self.position - flock_center
-            if to_center.length_squared() > 0:
-                push_out_of_flock = to_center.normalize() * 1000
-
-            # Haywire Zig-Zags
-            self.panic_timer -= 1
-            if self.panic_timer <= 0:
-                self.panic_dir = pygame.Vector2(1, 0).rotate(random.uniform(0, 360)) * 30.0
-                self.panic_timer = random.randint(8, 15)
-
-            # Fleeing force
-            to_predator = self.position - predator.position
-            flee = to_predator.normalize() * 200.0 if to_predator.length_squared() > 0 else pygame.Vector2(0,0)
-
-            # SAFE ZONE TETHER
-            dist_sq_to_center = (self.position - flock_center).length_squared()
-            safe_zone_sq = 10000 # 80^2 (reduced for tighter control)
-
-            if dist_sq_to_center > safe_zone_sq:
-                dist_to_center = math.sqrt(dist_sq_to_center)
-                stretch = dist_to_center - 80
-                pull_back = (flock_center - self.position).normalize() * (stretch * 0.08)
-            else:
-                pull_back = pygame.Vector2(0, 0)
-
-            self.apply_force(flee + self.panic_dir + pull_back)
-
-        else:
-            # NORMAL BOILING SPEED & SCATTER
-            dist_sq_to_predator = (self.position - predator.position).length_squared()
-            if dist_sq_to_predator < 22500:
-                scatter = (self.position - predator.position).normalize() * 20.0
-                self.apply_force(scatter)
-
-            self.max_speed, self.max_force = 14.0, 1.5
-            world_center = pygame.Vector2(WIDTH // 2, HEIGHT // 2)
-
-            # Tether to world center
-            world_dist_sq = (self.position - world_center).length_squared()
-            if world_dist_sq > 160000: # 400^2
-                self.apply_force((world_center - self.position).normalize() * 1.2)
-
-        # 6. INTEGRATION (Standard Clamping)
-        if self.acceleration.length() > self.max_force:
-            self.acceleration.scale_to_length(self.max_force)
-
-        self.velocity += self.acceleration
-
-        if self.velocity.length() > self.max_speed:
-            self.velocity.scale_to_length(self.max_speed)
-
-        self.position += self.velocity
-        self.acceleration *= 0
-
-        # Determines flapping animation state
-        self.is_swooping = is_targeted and self.velocity.length() > 28.0
-
-    def draw(self, screen, falcon_pos, zoom, WIDTH, HEIGHT, is_targeted):
+    def draw(self, screen, falcon_pos, zoom, WIDTH, HEIGHT, is_targeted, ticks):
         rel_pos = (self.position - falcon_pos) * zoom + pygame.Vector2(WIDTH // 2, HEIGHT // 2)
         if not (-300 < rel_pos.x < WIDTH + 300 and -300 < rel_pos.y < HEIGHT + 300): return
 
         f = self.velocity.normalize() if self.velocity.length() > 0.1 else self.current_dir
-        side = pygame.Vector2(-f.y, f.x)
-        s = self.scale * zoom * 0.95 # Keeping the larger size
-
-        # --- COLOR PALETTE ---
-        # Real starlings are dark but shimmer with cyan/green
-        body_outer = (20, 20, 30)   # Dark near-black edges
-        body_inner = (0, 139, 139)  # Cyan iridescent core
-
-        wing_color = (45, 48, 55)
-        beak_color = (255, 230, 90)
-
-        # 1. THE TAIL (Sharp Notched V)
-        tail_base = rel_pos - f * (8 * s)
-        t_l = rel_pos - f * (18 * s) + side * (7 * s)
-        t_r = rel_pos - f * (18 * s) - side * (7 * s)
-        pygame.draw.polygon(screen, wing_color, [tail_base, t_l, t_r])
-
-        # 2. THE WINGS (Triangular 'Flicker' Flap)
-        t = pygame.time.get_ticks() * self.flap_speed
-        flap_factor = math.sin(t)
-        for i in [1, -1]:
-            w_start = rel_pos + f * (2 * s)
-            w_tip = rel_pos + f * (8 * s) + (side * 30 * s * flap_factor * i)
-            w_back = rel_pos - f * (12 * s) + (side * 5 * s * i)
-            pygame.draw.polygon(screen, wing_color, [w_start, w_tip, w_back])
-
-        # 3. SLEEK DIAMOND BODY (Cyan Inner Core)
-        # Outer Diamond (Dark outline)
-        torso_outer = [
-            rel_pos + f * (20 * s),            # Sharp Head
-            rel_pos + f * (4 * s) + side * (9 * s),  # Shoulder R
-            rel_pos - f * (12 * s),            # Tail Joint
-            rel_pos + f * (4 * s) - side * (9 * s)   # Shoulder L
-        ]
-        pygame.draw.polygon(screen, body_outer, torso_outer)
-
-        # Inner Diamond (Cyan Iridescence)
-        # We scale the inner diamond slightly smaller (0.6x) to create an 'outline' effect
-        torso_inner = [
-            rel_pos + f * (12 * s),
-            rel_pos + f * (4 * s) + side * (5 * s),
-            rel_pos - f * (6 * s),
-            rel_pos + f * (4 * s) - side * (5 * s)
-        ]
-        pygame.draw.polygon(screen, body_inner, torso_inner)
+        draw_bird(screen, rel_pos, f, self.scale * zoom * 0.95, self.flap_speed, ticks)
+
+# Starling silhouette in local (forward, side[, flap]) units; the wing tips' side offset
+# follows the flap factor sin(t * flap_speed)
+BIRD_SHAPE = Silhouette([
+    # --- COLOR PALETTE ---
+    # Real starlings are dark but shimmer with cyan/green: wings (45, 48, 55),
+    # near-black body edges (20, 20, 30), cyan iridescent core (0, 139, 139)
+    # 1. THE TAIL (Sharp Notched V)
+    ("polygon", (45, 48, 55), [(-8, 0), (-18, 7), (-18, -7)]),
+    # 2. THE WINGS (Triangular 'Flicker' Flap)
+    ("polygon", (45, 48, 55), [(2, 0), (8, 0, 30), (-12, 5)]),
+    ("polygon", (45, 48, 55), [(2, 0), (8, 0, -30), (-12, -5)]),
+    # 3. SLEEK DIAMOND BODY: dark outer diamond, then the 0.6x cyan inner one as an 'outline' effect
+    ("polygon", (20, 20, 30), [(20, 0), (4, 9), (-12, 0), (4, -9)]),
+    ("polygon", (0, 139, 139), [(12, 0), (4, 5), (-6, 0), (4, -5)]),
+    # 4. POINTED YELLOW BEAK
+    ("polygon", (255, 230, 90), [(20, 1.5), (32, 0), (20, -1.5)]),
+    # 5. EYE
+    ("circle", (0, 0, 0), (15, 2.5), 1.5),
+])
+
+# Cheaper tiers for big flocks: tail tip to beak is 50 units, the triangle spans the body
+BIRD_LOD = LevelOfDetail((45, 48, 55), [(20, 0), (-18, 8), (-18, -8)], length=50,
+                         dense_color=(20, 20, 30))
+
+def draw_bird(screen, rel_pos, f, s, flap_speed, ticks):
+    """Starling silhouette at screen position rel_pos, facing unit vector f, at size s,
+    wings flapping on the animation clock `ticks` (ms, see BirdSim.animation_ms)."""
+    flap_factor = math.sin(ticks * flap_speed)
+    BIRD_SHAPE.draw(screen, [(rel_pos.x, rel_pos.y)], [(f.x, f.y)], s, flap_factor)
+
+class Flock:
+    """
+    Array-backed flock of Birds. Separation, alignment, cohesion, the swirl/pulse force,
+    predator scatter and the world-center tether run for every bird at once;
+    only the one bird the falcon is chasing takes the scalar 'haywire' path.
+    Birds are addressed by index (PredatorBird.target_bird holds an index into the flock).
+    """
+    HARD_RADIUS = 42
+
+    def __init__(self, count, width, height, skin=0):
+        """skin > 0 serves neighbors from a Verlet NeighborList with that margin (px)."""
+        self.rng = np.random.default_rng()
+        self.positions = np.column_stack((self.rng.integers(0, width, count, endpoint=True),
+                                          self.rng.integers(0, height, count, endpoint=True))).astype(np.float64)
+        self.velocities = self.rng.uniform(-4, 4, (count, 2))
+        self.accelerations = np.zeros((count, 2))
+        self.scale = 1.6
+
+        # --- NATURAL FLUTTER VARIABLES (same ranges as Bird) ---
+        self.flap_speed = self.rng.uniform(0.18, 0.28, count)
+        self.noise_seed = self.rng.uniform(0, 1000, count)
+        self.noise_speed = self.rng.uniform(0.01, 0.03, count)
+
+        self.max_speed = np.full(count, 14.0)
+        self.max_force = np.full(count, 1.5)
+        self.is_swooping = np.zeros(count, dtype=bool)
+        self.panic_timer = np.zeros(count, dtype=np.int64)
+        self.panic_dir = np.zeros((count, 2))
+        # Birds roam past the screen, so the grid covers a 3x3 screens area around it
+        self.bounds = (-width, -height, 2 * width, 2 * height)
+        self.index = None
+        self.skin = skin
+        self.neighbor_list = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def position_of(self, index):
+        return pygame.Vector2(*self.positions[index])
+
+    def velocity_of(self, index):
+        return pygame.Vector2(*self.velocities[index])
+
+    def center(self, fallback):
+        return pygame.Vector2(*self.positions.mean(axis=0)) if len(self) else fallback
+
+    def find_neighbors(self, cell_size):
+        """Candidate neighbor pairs (3x3 cells) for this frame's steering."""
+        if self.index is None or self.index.cell_size != cell_size:
+            self.index = CellIndex(cell_size, self.bounds)
+            if self.skin:
+                self.neighbor_list = NeighborList(cell_size, self.skin, self.bounds)
+        # The plain index stays current either way: PredatorBird picks its target from it
+        self.index.update(self.positions)
+        if self.neighbor_list is not None:
+            self.neighbor_list.update(self.positions)
+
+    def pair_blocks(self):
+        """This frame's candidate (i, j) pairs in blocks of consecutive birds (see CellIndex.pair_blocks)."""
+        if self.neighbor_list is not None:
+            return self.neighbor_list.blocks
+        return self.index.pair_blocks(1)
+
+    def flocking_forces(self, cell_size, ticks):
+        """
+        Boiling forces for every bird (the per-bird loop's steps 2-4), plus the hard-collision nudge.
+        The swirl turns with `ticks`, the sim clock in ms (BirdSim.animation_ms).
+        The pairs come in blocks that never split one bird's neighbors, so the per-bird sums
+        add up block by block and a dense flock never holds every pair at once.
+        """
+        pos, vel = self.positions, self.velocities
+        count = len(pos)
+        x, y = pos[:, 0].copy(), pos[:, 1].copy()
+        push_xy, sep, ali, coh = np.zeros((count, 2)), np.zeros((count, 2)), np.zeros((count, 2)), np.zeros((count, 2))
+        neighbor_count = np.zeros(count, dtype=np.intp)
+
+        for i, j in self.pair_blocks():
+            dx = x.take(i) - x.take(j)
+            dy = y.take(i) - y.take(j)
+            d_sq = dx * dx + dy * dy
+            near = (d_sq > 0) & (d_sq < cell_size ** 2)
+            i, j, dx, dy = i[near], j[near], dx[near], dy[near]
+            d = np.sqrt(d_sq[near])
+            dx /= d
+            dy /= d
+
+            # 1. HARD COLLISION: push overlapping birds apart before they steer
+            hit = d < self.HARD_RADIUS
+            push = (self.HARD_RADIUS - d[hit]) * 0.6
+            push_xy[:, 0] += np.bincount(i[hit], dx[hit] * push, count)
+            push_xy[:, 1] += np.bincount(i[hit], dy[hit] * push, count)
+
+            # 2. SEPARATION: the per-bird loop divided the running sum by 1.5 after every neighbor,
+            # so the k-th of n neighbors ends up weighted by 1.5 ** (k - n)
+            by_bird = np.argsort(i, kind="stable")
+            i, j, dx, dy, d = i[by_bird], j[by_bird], dx[by_bird], dy[by_bird], d[by_bird]
+            block_count = np.bincount(i, minlength=count)
+            first = np.cumsum(block_count) - block_count
+            rank = np.arange(len(i)) - first[i]
+            weight = (cell_size - d) * np.power(1.5, rank - block_count[i], dtype=np.float64)
+            sep[:, 0] += np.bincount(i, dx * weight, count)
+            sep[:, 1] += np.bincount(i, dy * weight, count)
+            neighbor_count += block_count
+
+            # 3. ALIGNMENT + COHESION sums
+            ali[:, 0] += np.bincount(i, vel[:, 0].take(j), count)
+            ali[:, 1] += np.bincount(i, vel[:, 1].take(j), count)
+            coh[:, 0] += np.bincount(i, x.take(j), count)
+            coh[:, 1] += np.bincount(i, y.take(j), count)
+
+        pos += push_xy
+        ali = normalized(ali, 0) * 1.8
+        has_neighbors = neighbor_count > 0
+        coh = normalized(coh / np.maximum(neighbor_count, 1)[:, None] - pos, 0) * 3.5
+
+        # 4. SWIRL / PULSE
+        t = ticks * 0.002
+        pulse = np.sin(t * 0.5 + pos[:, 0] * 0.01) * 3.0
+        swirl = np.outer((2.0 + pulse) * 20, (math.cos(t), math.sin(t)))
+
+        force = sep * 2.2 + ali + coh + swirl
+        force[~has_neighbors] = 0
+        return force
+
+    def haywire_force(self, index, flock_center, predator):
+        """The per-bird loop's targeted path for the one bird the falcon is chasing."""
+        position = self.position_of(index)
+        self.max_speed[index], self.max_force[index] = 36.0, 6.0
+        self.flap_speed[index] = 0.34
+        panic_dir = pygame.Vector2(*self.panic_dir[index])
+
+        to_center = position - flock_center
+        exit_flock = to_center.normalize() * random.randint(200, 300) if to_center.length_squared() > 0 else pygame.Vector2(0, 0)
+        to_predator = position - predator.position
+        flee = to_predator.normalize() * 25.0 if to_predator.length_squared() > 0 else pygame.Vector2(0, 0)
+        force = flee + panic_dir + exit_flock
+
+        # Haywire Zig-Zags
+        self.panic_timer[index] -= 1
+        if self.panic_timer[index] <= 0:
+            panic_dir = pygame.Vector2(1, 0).rotate(random.uniform(0, 360)) * 30.0
+            self.panic_dir[index] = panic_dir
+            self.panic_timer[index] = random.randint(8, 15)
+
+        # Fleeing force
+        flee = to_predator.normalize() * 200.0 if to_predator.length_squared() > 0 else pygame.Vector2(0, 0)
+
+        # SAFE ZONE TETHER
+        dist_sq_to_center = to_center.length_squared()
+        if dist_sq_to_center > 10000: # 80^2
+            pull_back = -to_center.normalize() * ((math.sqrt(dist_sq_to_center) - 80) * 0.08)
+        else:
+            pull_back = pygame.Vector2(0, 0)
 
-        # 4. POINTED YELLOW BEAK
-        head_tip = rel_pos + f * (20 * s)
-        beak_tip = rel_pos + f * (32 * s)
-        pygame.draw.polygon(screen, beak_color, [head_tip + side*(1.5*s), beak_tip, head_tip - side*(1.5*s)])
+        return force + flee + panic_dir + pull_back
+
+    def steer(self, WIDTH, HEIGHT, cell_size, flock_center, target, predator, ticks):
+        """Accumulates this frame's forces into accelerations (needs find_neighbors first)."""
+        pos = self.positions
+        self.accelerations += self.flocking_forces(cell_size, ticks)
+        normal = np.ones(len(self), dtype=bool)
+        if target is not None:
+            normal[target] = False
+
+        # 1. NORMAL BOILING SPEED & SCATTER
+        self.max_speed[:], self.max_force[:] = 14.0, 1.5
+        from_predator = pos - (predator.position.x, predator.position.y)
+        scatter = normal & (np.einsum("ij,ij->i", from_predator, from_predator) < 22500)
+        self.accelerations[scatter] += normalized(from_predator[scatter], 0) * 20.0
+
+        # 2. Tether to world center
+        to_world = np.array((WIDTH // 2, HEIGHT // 2), dtype=np.float64) - pos
+        far = normal & (np.einsum("ij,ij->i", to_world, to_world) > 160000) # 400^2
+        self.accelerations[far] += normalized(to_world[far], 0) * 1.2
+
+        # 3. TARGETED / HAYWIRE LOGIC (scalar path, one bird)
+        if target is not None:
+            self.accelerations[target] += self.haywire_force(target, flock_center, predator)
+
+    def integrate(self, target):
+        # INTEGRATION (Standard Clamping)
+        pos = self.positions
+        clamp_length(self.accelerations, self.max_force)
+        self.velocities += self.accelerations
+        clamp_length(self.velocities, self.max_speed)
+        pos += self.velocities
+        self.accelerations[:] = 0
 
-        # 5. EYE
-        eye_pos = rel_pos + f * (15 * s) + side * (2.5 * s)
-        pygame.draw.circle(screen, (0, 0, 0), (int(eye_pos.x), int(eye_pos.y)), int(1.5 * s))
+        # Determines flapping animation state
+        self.is_swooping[:] = False
+        if target is not None:
+            self.is_swooping[target] = lengths(self.velocities[target:target + 1])[0] > 28.0
+
+    def update(self, WIDTH, HEIGHT, cell_size, flock_center, target, predator, ticks):
+        """One step for the whole flock. `target` is the index of the chased bird (or None)."""
+        self.find_neighbors(cell_size)
+        self.steer(WIDTH, HEIGHT, cell_size, flock_center, target, predator, ticks)
+        self.integrate(target)
+
+    def draw(self, screen, falcon_pos, zoom, WIDTH, HEIGHT, ticks, indices=None, split=None, between=None):
+        """
+        Draws the birds in `indices` order (all of them by default) in one LOD pass, calling
+        between() once where the first `split` of them end (the falcon's slot in the depth order).
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        rel = (self.positions[indices] - (falcon_pos.x, falcon_pos.y)) * zoom + (WIDTH // 2, HEIGHT // 2)
+        visible = (rel[:, 0] > -300) & (rel[:, 0] < WIDTH + 300) & (rel[:, 1] > -300) & (rel[:, 1] < HEIGHT + 300)
+        behind = np.count_nonzero(visible[:split]) if split is not None else len(indices)
+        indices = indices[visible]
+        vel = self.velocities[indices]
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        slow = speed <= 0.1
+        forward = vel / np.where(slow, 1.0, speed)[:, None]
+        forward[slow] = (1.0, 0.0)
+        flap = np.sin(ticks * self.flap_speed[indices])
+        positions, scale = rel[visible], self.scale * zoom * 0.95
+        pending = [between] if between is not None else []
+
+        def draw_full(k):
+            # k is ascending, so the silhouettes keep the depth order around the between() slot
+            cut = np.searchsorted(k, behind)
+            for part in (k[:cut], k[cut:]):
+                BIRD_SHAPE.draw(screen, positions[part], forward[part], scale, flap[part])
+                if pending: pending.pop()()
+
+        # Big flocks: triangles, pixels or a heatmap where a silhouette wouldn't show (see lod.py)
+        BIRD_LOD.draw(screen, positions, forward, scale, draw_full, total=len(self))
+        if pending: pending.pop()()   # No silhouettes this frame: between() goes on top
 
 class PredatorBird:
     def __init__(self, x, y):
@@ -231,13 +317,18 @@ class PredatorBird:
         # --- NEW REALISM VARIABLES ---
         # Frames representing 3s, 5s, 7s, 9s, and 10s at 60fps
         self.returning_to_flock = False
+        # Last orbit point; chase phases keep steering toward it (was a module global that
+        # crashed if the very first update was already a chase)
+        self.patrol_target = pygame.Vector2(x, y)
+        # draw() reads these, and a pipelined loop may draw before the first update()
+        self.is_gliding = False
+        self.is_swooping = False
 
     def apply_force(self, force):
         self.acceleration += force / self.mass
 
-    def update(self, mode, grid, cell_size, flock_center, WIDTH, HEIGHT):
+    def update(self, mode, flock, flock_center, WIDTH, HEIGHT):
         # 1. ROBUST INITIALIZATION (Identical to your provided code)
-        global patrol_target
         if not hasattr(self, 'is_gliding'): self.is_gliding = False
         if not hasattr(self, 'glide_timer'): self.glide_timer = 60
         if not hasattr(self, 'chase_phase'): self.chase_phase = "ORBIT" # Default to Orbit
@@ -247,22 +338,16 @@ class PredatorBird:
 
         # 2. TARGET ACQUISITION (Spatial Mapping + Proximity Trigger)
         if mode == "HUNT":
-            if not self.target_bird:
-                possible_targets = []
-                grid_x, grid_y = int(self.position.x // cell_size), int(self.position.y // cell_size)
-                for dx in range(-3, 4):
-                    for dy in range(-3, 4):
-                        key = (grid_x + dx, grid_y + dy)
-                        if key in grid:
-                            possible_targets.extend(grid[key])
-
-                if possible_targets:
-                    self.target_bird = min(possible_targets, key=lambda b: (b.position - self.position).length_squared())
+            if self.target_bird is None and flock.index is not None:
+                # Closest bird in the 7x7 cells around the falcon (range -3 to 3)
+                self.target_bird = flock.index.nearest(self.position, flock.positions, reach=3)
 
             # --- THE ATTACK TRIGGER (Now based on Distance to Falcon) ---
-            if self.target_bird:
+            if self.target_bird is not None:
                 # Measure distance between falcon and bird (300px threshold = 90000 sq)
-                dist_to_falcon_sq = (self.target_bird.position - self.position).length_squared()
+                target_pos = flock.position_of(self.target_bird)
+                target_vel = flock.velocity_of(self.target_bird)
+                dist_to_falcon_sq = (target_pos - self.position).length_squared()
 
                 # TRIGGER: Attack if close to falcon (90000) OR manual override (mode is HUNT)
                 if dist_to_falcon_sq < 90000:
@@ -279,16 +364,16 @@ class PredatorBird:
             self.chase_phase = "ORBIT"
 
         # 3. BEHAVIOR LOGIC
-        if mode == "HUNT" and self.target_bird and self.chase_phase != "ORBIT":
+        if mode == "HUNT" and self.target_bird is not None and self.chase_phase != "ORBIT":
             self.hunt_timer -= 1
-            dist_vec = self.target_bird.position - self.position
+            dist_vec = target_pos - self.position
             distance = dist_vec.length()
 
             if self.chase_phase == "INTERCEPT":
                 self.is_swooping = True
                 self.max_speed, self.max_force = 60.0, 8.0
-                prediction = self.target_bird.velocity * 2
-                target_pos = self.target_bird.position + prediction
+                prediction = target_vel * 2
+                target_pos = target_pos + prediction
                 target_pos = target_pos/10
 
                 # Crash protection: check distance before normalizing
@@ -302,9 +387,9 @@ class PredatorBird:
             elif self.chase_phase == "TETHERED":
                 # YOUR LATCHING LOGIC
                 self.is_swooping = True
-                heading = self.target_bird.velocity.normalize() if self.target_bird.velocity.length() > 0 else pygame.Vector2(1,0)
-                self.position = self.target_bird.position - (heading * 400) # Snaps closer for the 'catch'
-                self.velocity = pygame.Vector2(self.target_bird.velocity)
+                heading = target_vel.normalize() if target_vel.length() > 0 else pygame.Vector2(1,0)
+                self.position = target_pos - (heading * 400) # Snaps closer for the 'catch'
+                self.velocity = pygame.Vector2(target_vel)
 
         else:
             # --- ORBITING PATROL ---
@@ -315,10 +400,10 @@ class PredatorBird:
             orbit_radius = 1800
             orbit_offset = pygame.Vector2(math.cos(self.patrol_angle),
                                           math.sin(self.patrol_angle)) * orbit_radius
-            patrol_target = flock_center + orbit_offset
+            self.patrol_target = flock_center + orbit_offset
 
         # 4. SOFT STEERING (Arrive behavior)
-        desired = (patrol_target - self.position)
+        desired = (self.patrol_target - self.position)
         dist = desired.length()
         if dist > 0:
             desired = desired.normalize() * self.max_speed
@@ -345,77 +430,54 @@ class PredatorBird:
 
         self.acceleration *= 0
 
-    def draw(self, screen, zoom, WIDTH, HEIGHT):
+    def draw(self, screen, zoom, WIDTH, HEIGHT, ticks):
         center = pygame.Vector2(WIDTH // 2, HEIGHT // 2)
         target_dir = self.velocity.normalize() if self.velocity.length() > 0 else self.current_dir
         self.current_dir += (target_dir - self.current_dir) * 0.1
         f = self.current_dir.normalize()
-        side = pygame.Vector2(-f.y, f.x)
         s = self.scale * zoom
 
-        WING_COL, BODY_COL, STRIPE_COL = (35, 38, 45), (60, 65, 75), (80, 85, 95)
-        BELLY_COL, BEAK_COL = (190, 195, 200), (255, 230, 90)
-
-        # 1. LONGER 'V' TAIL
-        # We move the points further back (-35s) and deepen the notch (-20s)
-        tail_base = center - f * (15 * s)
-        v_left = center - f * (38 * s) + side * (14 * s)
-        v_right = center - f * (38 * s) - side * (14 * s)
-        v_notch = center - f * (24 * s)
-        pygame.draw.polygon(screen, WING_COL, [tail_base, v_left, v_notch, v_right])
-
         # --- FLAP LOGIC (Kept your original timings) ---
         if self.is_swooping:
-            burst_gate = math.sin(pygame.time.get_ticks() * 0.005)
+            burst_gate = math.sin(ticks * 0.005)
             if burst_gate > 0:
-                flap = 0.4 + abs(math.sin(pygame.time.get_ticks()*0.5 * 0.05) * 0.25)
+                flap = 0.4 + abs(math.sin(ticks*0.5 * 0.05) * 0.25)
             else:
                 flap = 0.5
         elif self.is_gliding:
             flap = 0.9
         else:
-            flap = math.sin(pygame.time.get_ticks() * self.flap_speed * 0.3)
-
-        # 2. LONG WINGS WITH SIGNATURE 'V' BEND
-        # Changed w_tip and w_elbow to create a sharp, swept-back sickle shape
-        for i in [1, -1]:
-            w_start = center + f * (8 * s/8)
-            # Elbow pushed forward and out to create the 'V' bend
-            w_elbow = center + f * (12 * s) + (side * 20 * s * flap * i)
-            # Tip stretched back significantly for a long, thin profile
-            w_tip = center - f * (25 * s) + (side * 70 * s * flap * i)
-            w_back = center - f * (5 * s) + (side * 15 * s * flap * i)
-
-            pygame.draw.polygon(screen, WING_COL, [w_start, w_elbow, w_tip, w_back])
-
-            # Stripes
-            for offset in [0.4, 0.7]:
-                s_start = w_start + (w_elbow - w_start) * offset
-                s_end = w_back + (w_tip - w_back) * offset
-                pygame.draw.line(screen, STRIPE_COL, s_start, s_end, int(max(1, 1 * zoom)))
-
-        # 3. TEARDROP BODY
-        # Narrowed the tail-end and smoothed the front for a projectile shape
-        torso_pts = [
-            center + f * (28 * s),           # Front of head
-            center + f * (14 * s) + side * (9 * s),  # Broad shoulders
-            center - f * (10 * s) + side * (9 * s),  # Tapering flank
-            center - f * (22 * s),           # Sharp tail-end point
-            center - f * (10 * s) - side * (9 * s),  # Tapering flank
-            center + f * (14 * s) - side * (9 * s)   # Broad shoulders
-        ]
-        pygame.draw.polygon(screen, BODY_COL, torso_pts)
-
-        # Belly detail (Scaled to the teardrop)
-        pygame.draw.circle(screen, BELLY_COL, (int(center.x), int(center.y)), int(6.5 * s))
-
-        # 4. REFINED HEAD & SHORT BEAK
-        for i in [1, -1]:
-            eye_pos = center + f * (20 * s) + side * (4 * s * i)
-            pygame.draw.circle(screen, (255, 255, 0), (int(eye_pos.x), int(eye_pos.y)), int(2.2 * s))
-            pygame.draw.circle(screen, (0, 0, 0), (int(eye_pos.x), int(eye_pos.y)), int(1.8 * s))
-
-        # Beak is now shorter and more integrated (beak_tip moved from 32s to 28s)
-        head_pos = center + f * (26 * s)
-        beak_tip = center + f * (33 * s)
-        pygame.draw.polygon(screen, BEAK_COL, [head_pos + side * (3 * s), beak_tip, head_pos - side * (3 * s)])
\ No newline at end of file
+            flap = math.sin(ticks * self.flap_speed * 0.3)
+
+        FALCON_SHAPE.draw(screen, [(center.x, center.y)], [(f.x, f.y)], s, flap, line_width=int(max(1, 1 * zoom)))
+
+def _falcon_parts():
+    WING_COL, BODY_COL, STRIPE_COL = (35, 38, 45), (60, 65, 75), (80, 85, 95)
+    BELLY_COL, BEAK_COL = (190, 195, 200), (255, 230, 90)
+
+    # 1. LONGER 'V' TAIL
+    parts = [("polygon", WING_COL, [(-15, 0), (-38, 14), (-24, 0), (-38, -14)])]
+
+    # 2. LONG WINGS WITH SIGNATURE 'V' BEND: elbow pushed forward and out,
+    # tip stretched back for a long, thin swept-back sickle (side offsets follow the flap)
+    for i in [1, -1]:
+        w_start, w_elbow, w_tip, w_back = (1, 0, 0), (12, 0, 20 * i), (-25, 0, 70 * i), (-5, 0, 15 * i)
+        parts.append(("polygon", WING_COL, [w_start, w_elbow, w_tip, w_back]))
+        # Stripes: the same fractions of the way along the leading and trailing edges
+        for offset in [0.4, 0.7]:
+            s_start = tuple(a + (b - a) * offset for a, b in zip(w_start, w_elbow))
+            s_end = tuple(a + (b - a) * offset for a, b in zip(w_back, w_tip))
+            parts.append(("line", STRIPE_COL, [s_start, s_end]))
+
+    # 3. TEARDROP BODY + belly detail
+    parts.append(("polygon", BODY_COL, [(28, 0), (14, 9), (-10, 9), (-22, 0), (-10, -9), (14, -9)]))
+    parts.append(("circle", BELLY_COL, (0, 0), 6.5))
+
+    # 4. REFINED HEAD & SHORT BEAK
+    for i in [1, -1]:
+        parts.append(("circle", (255, 255, 0), (20, 4 * i), 2.2))
+        parts.append(("circle", (0, 0, 0), (20, 4 * i), 1.8))
+    parts.append(("polygon", BEAK_COL, [(26, 3), (33, 0), (26, -3)]))
+    return parts
+
+FALCON_SHAPE = Silhouette(_falcon_parts())
@@ -0,0 +1,199 @@
+import json
+import os
+import random
+import struct
+
+import numpy as np
+import pygame
+
+# Binary checkpoints of a whole FishSim/BirdSim, to resume a settled world instead of re-simulating it.
+#
+#   header : MAGIC, then struct "<II" (version, length of the JSON that follows)
+#   meta   : JSON - kind, size, agent count, every scalar attribute, RNG states, array table
+#   arrays : raw C-order array bytes, each starting on an ALIGN boundary
+#
+# Scalars go through the JSON with a few tags ({"vec2": [x, y]}, {"tuple": [...]},
+# {"array": name}, {"dict": {...}}); arrays are never converted, so loading 100k agents is
+# one read() plus views into the buffer. What a step rebuilds from scratch (this frame's
+# neighbor pairs, surfaces, the sprite atlas, the profiler) is left out. The cell grids, the
+# Verlet lists and the pressure solver's warm start are kept, since the next step builds on
+# them: a restored sim steps exactly like the one that was saved.
+
+MAGIC = b"BIOSIMCK"
+VERSION = 1
+HEADER = struct.Struct("<II")
+ALIGN = 64
+
+INDEX_FIELDS = ("cell_xy", "cell_ids", "order", "starts")
+NEIGHBOR_LIST_FIELDS = ("reference", "blocks", "hits", "rebuilds")
+SCHOOL_FIELDS = ("positions", "velocities", "accelerations", "max_speed", "max_force", "sway_offset", "sway_speed")
+FLOCK_FIELDS = ("positions", "velocities", "accelerations", "scale", "flap_speed", "noise_seed", "noise_speed",
+                "max_speed", "max_force", "is_swooping", "panic_timer", "panic_dir")
+
+def _parts(sim):
+    """(key, object, saved attributes) for every part of `sim` with state; None saves the whole __dict__."""
+    if sim.KIND == "fish":
+        school = sim.school
+        parts = [("sim", sim, ("mode", "steps", "previous")),
+                 ("school", school, SCHOOL_FIELDS),
+                 ("school.index", school.index, INDEX_FIELDS),
+                 ("prey_index", sim.prey_index, INDEX_FIELDS),
+                 ("water", sim.water, ("bubbles",)),
+                 ("water.fluid", sim.water.fluid, ("velocity", "_pressure", "_scratch"))]
+        agents, prefix = school, "school"
+    else:
+        birds = sim.birds
+        parts = [("sim", sim, ("mode", "steps", "current_zoom", "target_zoom", "previous", "clouds")),
+                 ("birds", birds, FLOCK_FIELDS),
+                 ("predator", sim.predator, None),
+                 ("depth", sim.depth, ("order", "sorted_keys"))]
+        if birds.index is not None:
+            parts.append(("birds.index", birds.index, INDEX_FIELDS))
+        agents, prefix = birds, "birds"
+    if agents.neighbor_list is not None:
+        parts += [(f"{prefix}.neighbor_list", agents.neighbor_list, NEIGHBOR_LIST_FIELDS),
+                  (f"{prefix}.neighbor_list.index", agents.neighbor_list.index, INDEX_FIELDS)]
+    return parts, agents
+
+def _encode(value, name, arrays):
+    if isinstance(value, np.ndarray):
+        arrays[name] = value
+        return {"array": name}
+    if isinstance(value, pygame.Vector2):
+        return {"vec2": [value.x, value.y]}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(v, f"{name}.{k}", arrays) for k, v in enumerate(value)]}
+    if isinstance(value, list):
+        return [_encode(v, f"{name}.{k}", arrays) for k, v in enumerate(value)]
+    if isinstance(value, dict):
+        return {"dict": {k: _encode(v, f"{name}.{k}", arrays) for k, v in value.items()}}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"{name}: can't checkpoint a {type(value).__name__}")
+
+def _decode(value, arrays):
+    if isinstance(value, list):
+        return [_decode(v, arrays) for v in value]
+    if not isinstance(value, dict):
+        return value
+    (tag, inner), = value.items()
+    if tag == "array": return arrays[inner]
+    if tag == "vec2": return pygame.Vector2(inner)
+    if tag == "tuple": return tuple(_decode(v, arrays) for v in inner)
+    return {k: _decode(v, arrays) for k, v in inner.items()}
+
+def save(sim, path):
+    """Writes the full state of a FishSim/BirdSim to `path` (atomically: a crash never leaves half a file)."""
+    parts, agents = _parts(sim)
+    arrays = {}
+    meta = {"kind": sim.KIND, "width": sim.width, "height": sim.height, "count": len(agents),
+            "skin": agents.neighbor_list.skin if agents.neighbor_list is not None else 0,
+            "parts": {key: _encode({name: getattr(obj, name) for name in fields} if fields else vars(obj), key, arrays)
+                      for key, obj, fields in parts},
+            "agent_rng": agents.rng.bit_generator.state,
+            "random": _encode(random.getstate(), "random", arrays)}
+    if sim.KIND == "fish":
+        meta["predators"] = [_encode(vars(p), f"predators.{k}", arrays) for k, p in enumerate(sim.predators)]
+
+    # Array table: offsets are relative to the start of the array section
+    table, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        table[name] = [array.dtype.str, list(array.shape), offset]
+        offset += array.nbytes
+    meta["arrays"] = table
+    blob = json.dumps(meta, separators=(",", ":")).encode()
+    start = -(-(len(MAGIC) + HEADER.size + len(blob)) // ALIGN) * ALIGN
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + HEADER.pack(VERSION, len(blob)) + blob)
+        for name, array in arrays.items():
+            f.seek(start + table[name][2])
+            f.write(np.ascontiguousarray(array).data)
+    os.replace(tmp, path)
+
+def _read(path):
+    """(meta, arrays) of a checkpoint; the arrays are writable views into one buffer read in a single call."""
+    with open(path, "rb") as f:
+        data = bytearray(os.fstat(f.fileno()).st_size)
+        f.readinto(data)
+    if len(data) < len(MAGIC) + HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: not a Bio-Sim checkpoint")
+    version, length = HEADER.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"{path}: checkpoint version {version}, expected {VERSION}")
+    position = len(MAGIC) + HEADER.size
+    meta = json.loads(data[position:position + length])
+    start = -(-(position + length) // ALIGN) * ALIGN
+    arrays = {}
+    for name, (dtype, shape, offset) in meta["arrays"].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(data, dtype, count, start + offset).reshape(shape)
+    return meta, arrays
+
+def _assign(obj, state):
+    """Sets every saved attribute; arrays the object already has in the right shape are filled in
+    place, so arrays other code holds on to (a tiled school's shared memory) stay live."""
+    for name, value in state.items():
+        current = getattr(obj, name, None)
+        if (isinstance(value, np.ndarray) and isinstance(current, np.ndarray) and current.flags.writeable
+                and current.shape == value.shape and current.dtype == value.dtype):
+            np.copyto(current, value)
+        else:
+            setattr(obj, name, value)
+
+def restore(sim, path):
+    """Puts the state saved in `path` back into `sim`, which must be of the same kind, size and agent count.
+    A tiled school's worker processes keep their own jitter RNGs, which aren't part of the checkpoint."""
+    _restore(sim, path, *_read(path))
+
+def _restore(sim, path, meta, arrays):
+    agents = sim.school if sim.KIND == "fish" else sim.birds
+    if (meta["kind"], meta["width"], meta["height"], meta["count"]) != (sim.KIND, sim.width, sim.height, len(agents)):
+        raise ValueError(f"{path}: {meta['count']} {meta['kind']} at {meta['width']}x{meta['height']} "
+                         f"don't fit a sim of {len(agents)} {sim.KIND} at {sim.width}x{sim.height}")
+    saved = meta["parts"]
+
+    if sim.KIND == "fish":
+        from boid1 import PredatorFish
+        predators = []
+        for state in meta["predators"]:
+            p = PredatorFish.__new__(PredatorFish)
+            p.__dict__.update(_decode(state, arrays))
+            predators.append(p)
+        sim.predators = predators
+    else:
+        birds = sim.birds
+        if "birds.index" in saved and birds.index is None:
+            birds.find_neighbors(sim.cell_size)   # Builds the lazy grids; their contents come next
+        elif "birds.index" not in saved:
+            birds.index, birds.neighbor_list = None, None
+        sim.predator.__dict__.clear()   # Attributes added by update() must go if they weren't there yet
+
+    parts, _ = _parts(sim)
+    for key, obj, _fields in parts:
+        if key in saved:
+            _assign(obj, _decode(saved[key], arrays))
+        elif key.endswith("neighbor_list"):
+            obj.reference = None   # Saved without the list (or with another skin): rebuild on the next step
+    agents.rng.bit_generator.state = meta["agent_rng"]
+    random.setstate(_decode(meta["random"], arrays))
+
+def load(path, workers=0):
+    """A new FishSim/BirdSim (fish: stepped by `workers` processes) in the state saved in `path`."""
+    from simulation import FishSim, BirdSim
+    meta, arrays = _read(path)
+    if meta["kind"] == "fish":
+        sim = FishSim(meta["width"], meta["height"], meta["count"], meta["skin"], workers)
+    else:
+        sim = BirdSim(meta["width"], meta["height"], meta["count"], meta["skin"])
+    try:
+        _restore(sim, path, meta, arrays)
+    except BaseException:
+        sim.close()
+        raise
+    return sim
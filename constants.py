@@ -1,30 +1,77 @@
 import pygame
 
-# Initialize pygame just enough to get screen info
-pygame.init()
-info = pygame.display.Info()
-
 # --- Display Constants ---
-# Dynamically gets the resolution of the current monitor
-WIDTH = info.current_w
-HEIGHT = info.current_h
-FPS = 60
-
-# --- UI Layout Scaling ---
-# Sidebar is 22% of width; other elements scale by height
-SIDEBAR_WIDTH = int(WIDTH * 0.22)
-UI_PADDING = int(HEIGHT * 0.02)
-DNA_CENTER_X = SIDEBAR_WIDTH // 2
-HEADER_HEIGHT = int(HEIGHT * 0.04)  # ~45px on 1080p
-
-# --- Font Sizes (Scalable) ---
-# Scales font size so it doesn't look tiny on 4K or huge on 720p
-FONT_SIZE_L = int(HEIGHT * 0.02)   # Large titles
-FONT_SIZE_M = int(HEIGHT * 0.035)   # Headers
-FONT_SIZE_S = int(HEIGHT * 0.02)   # Descriptions/Buttons
+# WIDTH/HEIGHT and everything derived from them are resolved lazily: the first read of any
+# of them asks SDL for the monitor size (display subsystem only), so importing this module
+# costs nothing and the headless runner can configure() a size without touching a display.
+FPS = 60           # Render cap
+SIM_RATE = 60      # Simulation steps per second, independent of the render rate
+MAX_CATCHUP_STEPS = 4  # Most steps a slow frame may run to catch up; older backlog is dropped
+SCREEN_CONSTANTS = ("WIDTH", "HEIGHT", "SIDEBAR_WIDTH", "UI_PADDING", "DNA_CENTER_X", "HEADER_HEIGHT",
+                    "FONT_SIZE_L", "FONT_SIZE_M", "FONT_SIZE_S", "VISION_RADIUS", "MAX_SPEED")
+
+def detect_display():
+    """Configures the screen constants for the current monitor (headless boxes report -1: 1080p)."""
+    if not pygame.display.get_init():
+        pygame.display.init()
+    info = pygame.display.Info()
+    configure(info.current_w if info.current_w > 0 else 1920,
+              info.current_h if info.current_h > 0 else 1080)
+
+def __getattr__(name):
+    # Only reached while a screen constant is still unset (module-level __getattr__, PEP 562)
+    if name in SCREEN_CONSTANTS:
+        detect_display()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def configure(width, height):
+    """
+    Recomputes every screen-dependent constant for a given resolution.
+    Runs on first use for the monitor size (detect_display); the headless runner calls it
+    directly to simulate at any resolution without a display.
+    """
+    global WIDTH, HEIGHT, SIDEBAR_WIDTH, UI_PADDING, DNA_CENTER_X, HEADER_HEIGHT
+    global FONT_SIZE_L, FONT_SIZE_M, FONT_SIZE_S, VISION_RADIUS, MAX_SPEED
+    WIDTH, HEIGHT = width, height
+
+    # --- UI Layout Scaling ---
+    # Sidebar is 22% of width; other elements scale by height
+    SIDEBAR_WIDTH = int(WIDTH * 0.22)
+    UI_PADDING = int(HEIGHT * 0.02)
+    DNA_CENTER_X = SIDEBAR_WIDTH // 2
+    HEADER_HEIGHT = int(HEIGHT * 0.04)  # ~45px on 1080p
+
+    # --- Font Sizes (Scalable) ---
+    # Scales font size so it doesn't look tiny on 4K or huge on 720p
+    FONT_SIZE_L = int(HEIGHT * 0.02)   # Large titles
+    FONT_SIZE_M = int(HEIGHT * 0.035)   # Headers
+    FONT_SIZE_S = int(HEIGHT * 0.02)   # Descriptions/Buttons
+
+    VISION_RADIUS = HEIGHT // 12
+    MAX_SPEED = HEIGHT // 200
 
 # --- Simulation Physics ---
 BOID_COUNT = 50
-VISION_RADIUS = HEIGHT // 12
-MAX_SPEED = HEIGHT // 200
-FORCE_STRENGTH = 0.05
\ No newline at end of file
+FISH_COUNT = 800    # Rows in the array-backed FishSchool
+BIRD_COUNT = 500    # Rows in the array-backed Flock
+MENU_BOID_COUNT = 400  # Background flock behind the menu / preview screens
+# Verlet neighbor-list skin in px (0 = rebuild neighbors from the grid every frame)
+FISH_NEIGHBOR_SKIN = 0
+BIRD_NEIGHBOR_SKIN = 0
+FISH_WORKERS = 0      # Processes stepping the school by world tile (0 = in the main process)
+FORCE_STRENGTH = 0.05
+WATER_GRID_SIZE = 40  # px per WaterEffects flow cell (smaller = finer wakes)
+SPRITE_CACHE_MB = 16  # Memory cap per species for pre-rendered fish/shark frames
+CLOUD_CACHE_MB = 64   # Memory cap for the bird sim's zoom-scaled cloud surfaces
+# Level of detail for big schools and flocks (see lod.py). Below LOD_MIN_AGENTS every agent gets
+# its full silhouette. Above it, agents shorter on screen than LOD_TRIANGLE_PX / LOD_PIXEL_PX, or
+# sharing a LOD_CELL_PX square with at least LOD_CROWD[0] / LOD_CROWD[1] agents, drop to a plain
+# triangle / a single pixel; from LOD_DENSITY_AGENTS on the whole group is one density heatmap.
+LOD_MIN_AGENTS = 3000
+LOD_TRIANGLE_PX = 12
+LOD_PIXEL_PX = 4
+LOD_CELL_PX = 24
+LOD_CROWD = (4, 10)
+LOD_DENSITY_AGENTS = 60000
+LOD_HEATMAP_PX = 6    # Heatmap bin size
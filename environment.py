@@ -1,22 +1,32 @@
+import copy
 import pygame
 import random
 import math
+import numpy as np
+
+from fluid import StableFluid
 
 class WaterEffects:
-    def __init__(self, width, height):
+    # Deposit stencils as (dx, dy, weight): fish push only their own cell; sharks push
+    # their cell at full strength plus 50% into all 9 cells around it (centre included)
+    FISH_SPLAT = ((0, 0, 1.0),)
+    SHARK_SPLAT = tuple((dx, dy, 1.5 if dx == dy == 0 else 0.5) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+
+    def __init__(self, width, height, grid_size=40):
         self.width = width
         self.height = height
-        self.bg_surface = pygame.Surface((width, height))
-        self.create_gradient_surface()
+        # Full-screen layers are made on the first draw (a headless run never needs them)
+        self.bg_surface = None
+        self.ray_surface = None
 
         # --- FLUID GRID SETUP ---
-        self.grid_size = 40  # Size of each fluid cell
+        self.grid_size = grid_size  # Size of each fluid cell
         self.cols = width // self.grid_size
         self.rows = height // self.grid_size
-        # Stores Vector2 flow for every cell
-        self.flow_grid = [[pygame.Vector2(0, 0) for _ in range(self.rows)] for _ in range(self.cols)]
+        # Stable-fluids solver; flow_grid is its (cols, rows, 2) velocity array,
+        # flow_grid[x, y] being the flow at (x * grid_size, y * grid_size)
+        self.fluid = StableFluid(self.cols, self.rows, self.grid_size)
 
-        self.ray_surface = pygame.Surface((width, height), pygame.SRCALPHA)
         self.bubbles = [
             {
                 "pos": pygame.Vector2(random.randint(0, width), random.randint(0, height)),
@@ -27,7 +37,35 @@ class WaterEffects:
             for _ in range(40)
         ]
 
-    def update(self, agents=[]):
+    @property
+    def flow_grid(self):
+        return self.fluid.velocity
+
+    def sample(self, positions):
+        """Bilinear flow (px/frame) under world `positions` (N, 2), for drag on the swimmers."""
+        return self.fluid.sample(positions)
+
+    def deposit(self, positions, pushes, splat):
+        """
+        Adds `pushes` (N, 2) to the cells under `positions` (N, 2), spread by a `splat` stencil.
+        Agents whose own cell is off the grid push nothing; stencil cells off the grid are dropped.
+        """
+        if len(positions) == 0: return
+        cells = np.floor_divide(positions, self.grid_size).astype(np.intp)
+        gx, gy = cells[:, 0], cells[:, 1]
+        inside = (gx >= 0) & (gx < self.cols) & (gy >= 0) & (gy < self.rows)
+        gx, gy, pushes = gx[inside], gy[inside], pushes[inside]
+
+        size = self.cols * self.rows
+        flow = self.flow_grid.reshape(size, 2)
+        for dx, dy, weight in splat:
+            nx, ny = gx + dx, gy + dy
+            ok = (nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)
+            flat = nx[ok] * self.rows + ny[ok]
+            flow[:, 0] += np.bincount(flat, pushes[ok, 0] * weight, size)
+            flow[:, 1] += np.bincount(flat, pushes[ok, 1] * weight, size)
+
+    def update(self, agents=[], school=None):
         # 1. Update Bubbles (Standard float logic)
         for b in self.bubbles:
             b["pos"].y -= b["speed"]
@@ -37,58 +75,58 @@ class WaterEffects:
                 b["pos"].y = self.height + 10
                 b["pos"].x = random.randint(0, self.width)
 
-        # 2. Dissipation (Water slowing down)
-        for x in range(self.cols):
-            for y in range(self.rows):
-                self.flow_grid[x][y] *= 0.94
-
-                # 3. Enhanced Agent Interaction
-        for a in agents:
-            gx = int(a.position.x // self.grid_size)
-            gy = int(a.position.y // self.grid_size)
-
-            if 0 <= gx < self.cols and 0 <= gy < self.rows:
-                # Identification: Check for 'hunt' behavior or scale to find the sharks
-                is_shark = getattr(a, 'scale', 1.0) >= 1.0 and hasattr(a, 'hunt')
-
-                if is_shark:
-                    # Sharks push a massive amount of water
-                    push_force = a.velocity * 0.25
-                    # Apply to center cell
-                    self.flow_grid[gx][gy] += push_force
-
-                    # NEIGHBOR SPREAD: Push water in the 8 cells around the shark
-                    # This creates the "Thick" fluid feel you want
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            nx, ny = gx + dx, gy + dy
-                            if 0 <= nx < self.cols and 0 <= ny < self.rows:
-                                # Neighbors get 50% of the force for a smooth gradient
-                                self.flow_grid[nx][ny] += push_force * 0.5
-                else:
-                    # Small fish only affect their immediate cell
-                    self.flow_grid[gx][gy] += a.velocity * 0.05
-
-    def draw(self, screen):
+        # 2. Enhanced Agent Interaction: sharks push a massive amount of water, small fish a little
+        for is_shark, splat, strength in ((True, self.SHARK_SPLAT, 0.25), (False, self.FISH_SPLAT, 0.05)):
+            group = [a for a in agents if a.is_shark == is_shark]
+            if group:
+                positions = np.array([(a.position.x, a.position.y) for a in group])
+                velocities = np.array([(a.velocity.x, a.velocity.y) for a in group])
+                self.deposit(positions, velocities * strength, splat)
+
+        # 3. Array-backed school: every fish pushes its own cell
+        if school is not None and len(school):
+            self.deposit(school.positions, school.velocities * 0.05, self.FISH_SPLAT)
+
+        # 4. Fluid step: diffuse, advect and project the wakes, then dissipate (water slowing down)
+        self.fluid.step()
+
+    def ensure_surfaces(self):
+        """Makes the full-screen gradient and ray layers if this is the first time they are needed."""
+        if self.bg_surface is None:
+            self.create_gradient_surface()
+            self.ray_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+
+    def snapshot(self):
+        """A copy for drawing while update() runs elsewhere: flow and bubbles copied, layers shared."""
+        self.ensure_surfaces()
+        view = copy.copy(self)
+        view.fluid = copy.copy(self.fluid)
+        view.fluid.velocity = self.fluid.velocity.copy()
+        view.bubbles = [dict(b, pos=pygame.Vector2(b["pos"])) for b in self.bubbles]
+        return view
+
+    def draw(self, screen, ticks):
+        """`ticks`: the animation clock in ms (FishSim.animation_ms) the light rays sway with."""
+        self.ensure_surfaces()
+
         # 1. Background Gradient
         screen.blit(self.bg_surface, (0, 0))
 
         # 2. Draw Fluid "Swish" Arcs/Lines
         # We draw subtle lines that represent the water's current
-        for x in range(self.cols):
-            for y in range(self.rows):
-                flow = self.flow_grid[x][y]
-                if flow.length_squared() > 0.1:
-                    start_pos = (x * self.grid_size, y * self.grid_size)
-                    # The line "sweeps" in the direction of the water flow
-                    end_pos = (start_pos[0] + flow.x * 4, start_pos[1] + flow.y * 4)
-
-                    # Gradient Ocean Blue color based on flow strength
-                    alpha = min(180, int(flow.length() * 40))
-                    color = (100, 180, 255, alpha)
-
-                    # Draw a thin, swept line (the "fluid" texture)
-                    pygame.draw.line(screen, color, start_pos, end_pos, 1)
+        # Only cells flowing fast enough are visible; the mask picks them all in one pass
+        strength_sq = np.einsum("xyk,xyk->xy", self.flow_grid, self.flow_grid)
+        xs, ys = np.nonzero(strength_sq > 0.1)
+        if len(xs):
+            flow = self.flow_grid[xs, ys]
+            start = np.column_stack((xs, ys)) * self.grid_size
+            # The line "sweeps" in the direction of the water flow
+            end = start + flow * 4
+            # Gradient Ocean Blue color based on flow strength
+            alpha = np.minimum(180, (np.sqrt(strength_sq[xs, ys]) * 40).astype(int))
+            for start_pos, end_pos, a in zip(start.tolist(), end.tolist(), alpha.tolist()):
+                # Draw a thin, swept line (the "fluid" texture)
+                pygame.draw.line(screen, (100, 180, 255, a), start_pos, end_pos, 1)
 
         # 3. Bubbles
         for b in self.bubbles:
@@ -96,7 +134,7 @@ class WaterEffects:
 
         # 4. God Rays
         self.ray_surface.fill((0, 0, 0, 0))
-        current_time = pygame.time.get_ticks() * 0.001
+        current_time = ticks * 0.001
         for i in range(3):
             ray_x = (self.width / 3) * i + math.sin(current_time + i) * 50
             points = [(ray_x, 0), (ray_x + 150, 0), (ray_x - 100, self.height)]
@@ -106,12 +144,15 @@ class WaterEffects:
     def create_gradient_surface(self):
         top_color = (60, 120, 190)
         bottom_color = (10, 25, 50)
+        # One 1px column, stretched sideways: a single scale instead of a line per row
+        column = pygame.Surface((1, self.height))
         for y in range(self.height):
             p = y / self.height
             r = int(top_color[0] + (bottom_color[0] - top_color[0]) * p)
             g = int(top_color[1] + (bottom_color[1] - top_color[1]) * p)
             b = int(top_color[2] + (bottom_color[2] - top_color[2]) * p)
-            pygame.draw.line(self.bg_surface, (r, g, b), (0, y), (self.width, y))
+            column.set_at((0, y), (r, g, b))
+        self.bg_surface = pygame.transform.scale(column, (self.width, self.height))
 
 import pygame
 import random
@@ -0,0 +1,196 @@
+"""
+Offline frame export: steps a simulation at SIM_RATE, draws every output frame off-screen and
+writes it out as a numbered image sequence, encoded by a pool of worker processes.
+
+    python export.py fish --mode 3 --seconds 20 --out fishnado/                  # 1920x1080 PNGs
+    python export.py bird --mode HUNT --frames 600 --resolution 3840x2160 --workers 6 --out hunt/
+    ffmpeg -framerate 60 -i fishnado/frame_%06d.png -pix_fmt yuv420p fishnado.mp4
+
+Frames are drawn straight into shared-memory slots (`--queue` of them); a worker process
+compresses a slot while the main process goes on stepping and drawing into the next free one.
+Drawing only waits when every slot is still being encoded, so memory stays at `--queue` frames.
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+import constants
+from headless import make_sim, parse_size
+from tiles import SharedArrays
+
+# --- WORKER SIDE ---
+def _encode(name, spec, size, tasks, done):
+    """Encoder process: saves the slots named on `tasks` and hands each one back on `done`."""
+    shared = SharedArrays(spec, name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None: break
+            slot, path = task
+            try:
+                # frombuffer wraps the shared pixels as they are: nothing is copied before compression
+                pygame.image.save(pygame.image.frombuffer(shared[f"slot{slot}"], size, "RGBX"), path)
+                done.put((slot, None))
+            except Exception as error:
+                done.put((slot, f"{path}: {error!r}"))
+    finally:
+        shared.close()
+
+# --- MAIN PROCESS SIDE ---
+class FrameExporter:
+    """
+    Ring of `depth` frame slots in shared memory, drained by `workers` encoder processes.
+
+        with FrameExporter("out", (1920, 1080)) as exporter:
+            surface = exporter.acquire()    # blocks only while every slot is still being encoded
+            ...draw the frame on surface...
+            exporter.submit(number)         # queued as out/frame_000042.png
+
+    The image format follows the pattern's extension (png, bmp, tga, jpg).
+    """
+    def __init__(self, directory, size, workers=2, depth=8, pattern="frame_{:06d}.png"):
+        os.makedirs(directory, exist_ok=True)
+        self.directory, self.size, self.pattern = directory, size, pattern
+        width, height = size
+        spec = [(f"slot{slot}", (height, width, 4), np.uint8) for slot in range(depth)]
+        self.shared = SharedArrays(spec)
+        self.surfaces = [pygame.image.frombuffer(self.shared[f"slot{slot}"], size, "RGBX") for slot in range(depth)]
+        self.free = list(range(depth))
+        self.current = None
+        self.frames = 0
+        self.wait_ms = 0.0   # Time the renderer spent waiting for a free slot
+
+        context = multiprocessing.get_context()
+        self.tasks, self.done = context.Queue(), context.Queue()
+        self.workers = [context.Process(target=_encode, args=(self.shared.name, spec, size, self.tasks, self.done),
+                                        daemon=True)
+                        for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _reclaim(self, block):
+        """Takes finished slots back from the encoders (waiting for one if `block`)."""
+        while True:
+            try:
+                slot, error = self.done.get(block=block)
+            except queue.Empty:
+                return
+            if error is not None:
+                raise RuntimeError(f"frame encoding failed: {error}")
+            self.free.append(slot)
+            block = False
+
+    def acquire(self):
+        """The Surface to draw the next frame on, backed by a free slot's shared memory."""
+        self._reclaim(block=False)
+        if not self.free:
+            start = time.perf_counter()
+            self._reclaim(block=True)
+            self.wait_ms += (time.perf_counter() - start) * 1000.0
+        self.current = self.free.pop()
+        return self.surfaces[self.current]
+
+    def submit(self, number):
+        """Queues the frame drawn on the acquired surface for encoding."""
+        path = os.path.join(self.directory, self.pattern.format(number))
+        self.tasks.put((self.current, path))
+        self.current = None
+        self.frames += 1
+
+    def close(self):
+        """Waits for every queued frame to be written, then stops the encoders."""
+        if self.shared is None: return
+        try:
+            pending = len(self.surfaces) - len(self.free) - (self.current is not None)
+            for _ in range(pending):
+                slot, error = self.done.get()
+                self.free.append(slot)
+                if error is not None:
+                    raise RuntimeError(f"frame encoding failed: {error}")
+        finally:
+            for _ in self.workers:
+                self.tasks.put(None)
+            for worker in self.workers:
+                worker.join()
+            self.surfaces.clear()   # They hold the shared buffers open
+            self.shared.close(unlink=True)
+            self.shared = None
+
+def export(sim, exporter, frames, fps, resolution=None):
+    """Steps `sim` in fixed SIM_RATE steps against a clock of `fps` output frames per second and
+    draws every frame into `exporter`, scaled to `resolution` when it differs from the world size.
+    The step schedule is integer arithmetic, so no frame ever repeats or skips a step by rounding."""
+    rate = constants.SIM_RATE
+    world = (sim.width, sim.height)
+    canvas = None
+    done = 0
+    for frame in range(frames):
+        due, remainder = divmod(frame * rate, fps)   # Frame f shows sim time f / fps: `due` steps and a fraction
+        needed = due + (remainder > 0)
+        for _ in range(needed - done):
+            sim.step()
+        done = needed
+        alpha = remainder / fps if remainder else 1.0   # Drawn between steps `due` and `due + 1`
+        target = exporter.acquire()
+        if resolution is None or resolution == world:
+            sim.draw(target, alpha)
+        else:
+            if canvas is None:
+                canvas = pygame.Surface(world, 0, target)   # Same pixel format, so smoothscale can write into target
+            sim.draw(canvas, alpha)
+            pygame.transform.smoothscale(canvas, resolution, target)
+        exporter.submit(frame)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Bio-Sim footage as an image sequence.")
+    parser.add_argument("sim", choices=["fish", "bird"])
+    parser.add_argument("--out", required=True, help="directory for the frames")
+    parser.add_argument("--agents", type=int, default=None, help="fish/bird count (default: constants)")
+    parser.add_argument("--mode", default=None, help="fish: 1/2/3, bird: SCOUT/HUNT")
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="world size, WIDTHxHEIGHT")
+    parser.add_argument("--resolution", type=parse_size, default=None, help="output size (default: the world size)")
+    frames = parser.add_mutually_exclusive_group()
+    frames.add_argument("--frames", type=int, default=None)
+    frames.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--fps", type=int, default=60, help="output frame rate")
+    parser.add_argument("--warmup", type=int, default=0, help="sim steps to run before the first frame")
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) - 1, 1), help="encoder processes")
+    parser.add_argument("--queue", type=int, default=8, help="frames in flight (bounds memory)")
+    parser.add_argument("--format", default="png", choices=["png", "bmp", "tga", "jpg"])
+    args = parser.parse_args(argv)
+
+    count = args.frames if args.frames is not None else round((args.seconds or 10.0) * args.fps)
+    width, height = args.size
+    resolution = args.resolution or args.size
+    sim = make_sim(args.sim, args.agents, width, height, args.mode)
+    try:
+        for _ in range(args.warmup):
+            sim.step()
+        start = time.perf_counter()
+        with FrameExporter(args.out, resolution, args.workers, args.queue, f"frame_{{:06d}}.{args.format}") as exporter:
+            export(sim, exporter, count, args.fps, resolution)
+        elapsed = time.perf_counter() - start
+    finally:
+        sim.close()
+
+    print(f"{args.sim}: {count} frames at {resolution[0]}x{resolution[1]} -> {args.out} in {elapsed:.2f}s "
+          f"({count / elapsed:.1f} frames/sec, {exporter.wait_ms / 1000.0:.2f}s waiting on encoders)")
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
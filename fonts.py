@@ -0,0 +1,30 @@
+import pygame
+
+from sprites import SurfaceCache
+
+# Process-wide font registry + rendered-text cache.
+# pygame.font.SysFont walks the system font list (fc-list on Linux) and opens the font file
+# on every call, so UI code asks get_font() instead and gets the same Font object back.
+# render_text() hands out shared surfaces: blit them, never draw on them.
+
+_fonts = {}
+TEXT_CACHE = SurfaceCache(8 << 20)   # (font, text, color, antialias) -> Surface
+
+def get_font(name, size, bold=False, italic=False):
+    """SysFont(name, size, bold, italic), created once per process. `name` may be a list of fallbacks."""
+    key = (tuple(name) if isinstance(name, (list, tuple)) else name, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold=bold, italic=italic)
+    return font
+
+def render_text(font, text, color, antialias=True):
+    """font.render(text, antialias, color), cached for strings that repeat frame after frame."""
+    key = (font, text, tuple(color), antialias)
+    surface = TEXT_CACHE.get(key)
+    if surface is None:
+        surface = font.render(text, antialias, color)
+        TEXT_CACHE.put(key, surface, surface)
+    return surface
@@ -0,0 +1,107 @@
+"""
+Headless runner: steps the fish or bird simulation with no display and no frame cap.
+
+    python headless.py fish --agents 20000 --steps 500 --size 1920x1080 --mode 3
+    python headless.py bird --agents 2000 --mode HUNT
+    python headless.py fish --mode 3 --steps 3600 --record fishnado.traj   # then: python replay.py fishnado.traj
+    python headless.py fish --mode 3 --steps 20000 --save-checkpoint settled.ckpt
+    python headless.py fish --checkpoint settled.ckpt --steps 600         # resumes where that run stopped
+"""
+import argparse
+import os
+import time
+
+# SDL must be told before pygame is imported anywhere
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+import checkpoint
+import constants
+from trajectory import TrajectoryWriter
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def make_sim(sim_name, agents, width, height, mode=None, skin=None, workers=None):
+    """Builds a FishSim/BirdSim for the given resolution, already switched into `mode`.
+    skin=None / workers=None keep the constants' Verlet neighbor-list and fish worker settings.
+    Call sim.close() when done (a tiled fish school holds worker processes)."""
+    constants.configure(width, height)
+    from simulation import FishSim, BirdSim
+
+    if sim_name == "fish":
+        sim = FishSim(width, height, agents or constants.FISH_COUNT,
+                      constants.FISH_NEIGHBOR_SKIN if skin is None else skin,
+                      constants.FISH_WORKERS if workers is None else workers)
+        if mode is not None: sim.set_mode(int(mode))
+    else:
+        sim = BirdSim(width, height, agents or constants.BIRD_COUNT,
+                      constants.BIRD_NEIGHBOR_SKIN if skin is None else skin)
+        if mode is not None: sim.set_mode(str(mode).upper())
+    return sim
+
+def run(sim, steps, render=False, recorder=None):
+    """Steps `sim` flat out and returns the elapsed seconds.
+    With render=True every step is also drawn to an off-screen Surface;
+    a trajectory.TrajectoryWriter `recorder` gets every step appended."""
+    canvas = pygame.Surface((sim.width, sim.height)) if render else None
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step()
+        if canvas is not None:
+            sim.draw(canvas)
+        if recorder is not None:
+            recorder.record(sim)
+    return time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Bio-Sim without a window.")
+    parser.add_argument("sim", choices=["fish", "bird"])
+    parser.add_argument("--agents", type=int, default=None, help="fish/bird count (default: constants)")
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080), help="WIDTHxHEIGHT")
+    parser.add_argument("--mode", default=None, help="fish: 1/2/3, bird: SCOUT/HUNT")
+    parser.add_argument("--render", action="store_true", help="also draw every step off-screen")
+    parser.add_argument("--skin", type=float, default=None, help="Verlet neighbor-list skin in px (0 = off)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="fish: step the school in this many processes, one world tile each (0 = off)")
+    parser.add_argument("--record", metavar="PATH", default=None, help="append every step to a trajectory file")
+    parser.add_argument("--keyframe-interval", type=int, default=60, help="frames between trajectory keyframes")
+    parser.add_argument("--checkpoint", metavar="PATH", default=None,
+                        help="start from a saved checkpoint (its kind, size, count and skin win over the flags)")
+    parser.add_argument("--save-checkpoint", metavar="PATH", default=None, help="save the final state here")
+    args = parser.parse_args(argv)
+
+    if args.checkpoint:
+        sim = checkpoint.load(args.checkpoint, constants.FISH_WORKERS if args.workers is None else args.workers)
+        constants.configure(sim.width, sim.height)
+        if args.mode is not None: sim.set_mode(int(args.mode) if sim.KIND == "fish" else str(args.mode).upper())
+        args.sim = sim.KIND
+    else:
+        sim = make_sim(args.sim, args.agents, *args.size, args.mode, args.skin, args.workers)
+    width, height = sim.width, sim.height
+    recorder = TrajectoryWriter(args.record, sim, args.keyframe_interval) if args.record else None
+    try:
+        elapsed = run(sim, args.steps, args.render, recorder)
+        if args.save_checkpoint: checkpoint.save(sim, args.save_checkpoint)
+    finally:
+        sim.close()
+        if recorder is not None: recorder.close()
+
+    agents = len(sim.school) if args.sim == "fish" else len(sim.birds)
+    print(f"{args.sim}: {agents} agents, {args.steps} steps at {width}x{height} "
+          f"in {elapsed:.2f}s -> {args.steps / elapsed:.1f} steps/sec")
+    stats = sim.neighbor_stats()
+    if stats:
+        print(f"neighbor list: skin {stats['skin']}px, {stats['hits']} hits / {stats['rebuilds']} rebuilds "
+              f"({stats['hit_rate']:.0%} served from cache)")
+    tiles = sim.tile_stats() if args.sim == "fish" else None
+    if tiles:
+        print(f"tiles: {tiles['layout'][0]}x{tiles['layout'][1]}, {tiles['ghosts']} ghost rows per step, "
+              f"{tiles['migrations']} migrations")
+
+if __name__ == "__main__":
+    main()
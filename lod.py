@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+import pygame
+
+import constants
+from sprites import SpriteAtlas
+
+class LevelOfDetail:
+    """
+    How much drawing each agent of a big group gets, from its size on screen and how crowded its
+    patch of screen is (an agent buried in a crowd is mostly covered by its neighbors anyway):
+
+      FULL      the species' own silhouette
+      TRIANGLE  one oriented triangle in the species' body color, blitted from its own SpriteAtlas
+      PIXEL     one pixel, written straight into the screen's pixel array
+      DENSITY   from LOD_DENSITY_AGENTS on: no agents at all, but a heatmap of the whole group -
+                a 2D histogram of the positions, tinted with the body color and blitted once
+
+    The thresholds live in constants.py (LOD_*) and are read on every draw.
+    """
+    FULL, TRIANGLE, PIXEL, DENSITY = range(4)
+
+    def __init__(self, color, triangle, length, dense_color=None):
+        """
+        :param color: Body color for triangles, pixels and the heatmap.
+        :param dense_color: Heatmap color where the agents pile up several deep (default: `color`).
+        :param triangle: Three (forward, side) points in the species' local units (see Silhouette).
+        :param length: Nose-to-tail length in local units; times the draw scale, the on-screen size.
+        """
+        self.color = color
+        self.dense_color = dense_color or color
+        self.points = triangle
+        extent = max(math.hypot(*p) for p in triangle)
+        self.triangles = SpriteAtlas(self.render_triangle, extent, headings=48, phases=1, max_bytes=1 << 20)
+        self.length = length
+        # Local units^2 one agent covers, for the heatmap's opacity
+        self.area = length * max(abs(side) for _, side in triangle)
+        self.counts = [0, 0, 0, 0]   # Agents drawn per tier by the last draw()
+
+    def render_triangle(self, surface, center, forward, side, sway, scale, variant):
+        pygame.draw.polygon(surface, self.color, [center + (forward * f + side * s) * scale for f, s in self.points])
+
+    def draw(self, screen, positions, forwards, scale, draw_full, total=None):
+        """
+        Draws agents at screen `positions` (N, 2) facing the unit vectors `forwards` (N, 2).
+        draw_full(indices) draws the agents at `indices` with their full silhouette.
+        `total` is the size of the whole group, which picks the tiers (default: the agents passed
+        here); crowding is measured over the agents passed here, so pass every visible one at once.
+        """
+        count = len(positions)
+        total = count if total is None else total
+        self.counts = [0, 0, 0, 0]
+        if count == 0: return
+        if total < constants.LOD_MIN_AGENTS:
+            self.counts[self.FULL] = count
+            draw_full(np.arange(count))
+            return
+        if total >= constants.LOD_DENSITY_AGENTS:
+            self.counts[self.DENSITY] = count
+            self.draw_density(screen, positions, scale)
+            return
+
+        # Tier from the on-screen length, then one tier down per crowding threshold reached
+        px = self.length * scale
+        base = self.FULL if px >= constants.LOD_TRIANGLE_PX else self.TRIANGLE if px >= constants.LOD_PIXEL_PX else self.PIXEL
+        crowd = self.crowding(positions, screen.get_size())
+        low, high = constants.LOD_CROWD
+        tier = np.minimum(base + (crowd >= low) + (crowd >= high), self.PIXEL)
+
+        # Cheapest first: the detailed agents stay on top of the crowds they stand out from
+        pixels, triangles, full = (np.flatnonzero(tier == t) for t in (self.PIXEL, self.TRIANGLE, self.FULL))
+        self.counts[:3] = len(full), len(triangles), len(pixels)
+        self.draw_pixels(screen, positions[pixels])
+        if len(triangles):
+            # Scale rounded to 1/20, so a zoom easing in doesn't re-render the atlas every frame
+            self.triangles.set_scale(max(round(scale * 20) / 20, 0.05))
+            ahead = forwards[triangles]
+            self.triangles.draw(screen, positions[triangles], np.arctan2(ahead[:, 1], ahead[:, 0]), np.zeros(len(triangles)))
+        if len(full):
+            draw_full(full)
+
+    @staticmethod
+    def crowding(positions, size):
+        """How many agents share each agent's LOD_CELL_PX square (one bincount over the screen grid)."""
+        cell = constants.LOD_CELL_PX
+        cols, rows = size[0] // cell + 1, size[1] // cell + 1
+        gx = np.clip((positions[:, 0] // cell).astype(np.intp), 0, cols - 1)
+        gy = np.clip((positions[:, 1] // cell).astype(np.intp), 0, rows - 1)
+        cells = gx * rows + gy
+        return np.bincount(cells, minlength=cols * rows)[cells]
+
+    def draw_pixels(self, screen, positions):
+        if len(positions) == 0: return
+        width, height = screen.get_size()
+        xy = positions.astype(np.intp)
+        xy = xy[(xy[:, 0] >= 0) & (xy[:, 0] < width) & (xy[:, 1] >= 0) & (xy[:, 1] < height)]
+        try:
+            pixels = pygame.surfarray.pixels2d(screen)
+        except ValueError:   # 24-bit surfaces have no 2D pixel view
+            for x, y in xy.tolist():
+                screen.set_at((x, y), self.color)
+            return
+        pixels[xy[:, 0], xy[:, 1]] = screen.map_rgb(self.color)
+        del pixels   # Unlocks the surface
+
+    def draw_density(self, screen, positions, scale):
+        """
+        The group as one surface: positions binned into LOD_HEATMAP_PX squares, box-blurred over
+        a body length, each tinted with the body color at the opacity that many overlapping agents
+        would give it (1 - e^-coverage) and darkened toward dense_color where they pile up, then
+        smoothly scaled up to the screen.
+        """
+        width, height = screen.get_size()
+        bin_px = constants.LOD_HEATMAP_PX
+        cols, rows = -(-width // bin_px), -(-height // bin_px)
+        x, y = positions[:, 0], positions[:, 1]
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        cells = (x[inside] // bin_px).astype(np.intp) * rows + (y[inside] // bin_px).astype(np.intp)
+        histogram = np.bincount(cells, minlength=cols * rows).reshape(cols, rows)
+
+        # Spread every bin over about one body length, as the agents' silhouettes would be
+        reach = max(int(self.length * scale / bin_px / 2), 0)
+        if reach:
+            padded = np.pad(histogram, reach)
+            width_k = 2 * reach + 1
+            rows_sum = sum(padded[k:k + cols] for k in range(width_k))
+            histogram = sum(rows_sum[:, k:k + rows] for k in range(width_k)) / (width_k * width_k)
+        coverage = histogram.T * (self.area * scale * scale / (bin_px * bin_px))
+        # BGRA is the byte order of SDL's native 32-bit format: its fast blitter takes the heatmap
+        # as is, where an RGBA source goes down the per-pixel path at ~10x the cost
+        bgra = np.empty((rows, cols, 4), dtype=np.uint8)
+        depth = -np.expm1(-coverage / 4)[..., None]   # Shades toward dense_color a few agents deep
+        color, dense = np.array(self.color[::-1], dtype=np.float64), np.array(self.dense_color[::-1], dtype=np.float64)
+        bgra[..., :3] = color + (dense - color) * depth
+        bgra[..., 3] = -np.expm1(-coverage) * 255
+        heat = pygame.image.frombuffer(bgra, (cols, rows), "BGRA")
+        screen.blit(pygame.transform.smoothscale(heat, (cols * bin_px, rows * bin_px)), (0, 0))
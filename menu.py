@@ -1,7 +1,12 @@
 import math
 import random
+import numpy as np
 import pygame
 from boid1 import boid
+from fonts import get_font, render_text
+from silhouette import Silhouette
+from spatial import CellIndex
+from vecmath import clamp_length, lengths, steer
 import constants
 
 class MenuBoid(boid):
@@ -41,21 +46,117 @@ class MenuBoid(boid):
 
 
     def draw(self, screen):
-        # Calculate triangle points based on velocity direction
+        # Triangle pointing along the velocity direction
         if self.velocity.length() > 0:
             direction = self.velocity.normalize()
-            perp = pygame.Vector2(-direction.y, direction.x) * 5
-            tip = self.position + direction * 10
-            base1 = self.position - direction * 5 + perp
-            base2 = self.position - direction * 5 - perp
+            MENU_BOID_SHAPE.draw(screen, [(self.position.x, self.position.y)], [(direction.x, direction.y)], 1.0,
+                                 colors=[self.color])
 
-            # Create a small surface for alpha transparency
-            points = [tip, base1, base2]
-            pygame.draw.polygon(screen, self.color, points)
+# Tip 10px ahead, 5px-wide base 5px behind; the color comes from each boid
+MENU_BOID_SHAPE = Silhouette([("polygon", None, [(10, 0), (-5, 5), (-5, -5)])])
+
+class MenuFlock:
+    """
+    Array-backed version of the menu's MenuBoid background: one row per boid, neighbors
+    from a CellIndex instead of every boid checking all the others (O(N) instead of O(N^2)).
+    Same forces as main()'s old loop: separation * 5 * 1.5, cohesion * 0.5, avoid_walls * 2.
+    """
+    SEPARATION_RADIUS = 25
+    PERCEPTION_RADIUS = 50
+    WALL_MARGIN = 50
+    PALETTE = [(0, 212, 255), (255, 140, 0), (0, 255, 0)]  # Electric Blue, Bright Orange, Bright Green
+
+    def __init__(self, count, width, height):
+        self.rng = np.random.default_rng()
+        self.positions = np.column_stack((self.rng.integers(0, width, count, endpoint=True),
+                                          self.rng.integers(0, height, count, endpoint=True))).astype(np.float64)
+        self.velocities = self.rng.uniform(-1, 1, (count, 2))
+        self.accelerations = np.zeros((count, 2))
+        # Same limits as MenuBoid
+        self.max_speed = 100
+        self.max_force = 0.1
+        self.colors = self.rng.integers(0, len(self.PALETTE), count)
+        self.index = CellIndex(self.PERCEPTION_RADIUS, (0, 0, width, height))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def flocking_forces(self):
+        """Separation (25px) and cohesion (50px) for every boid from one neighbor pass."""
+        pos, vel = self.positions, self.velocities
+        count = len(pos)
+        self.index.update(pos)
+        i, j = self.index.pairs(1)
+
+        x, y = pos[:, 0].copy(), pos[:, 1].copy()
+        dx = x.take(i) - x.take(j)
+        dy = y.take(i) - y.take(j)
+        d_sq = dx * dx + dy * dy
+        near = d_sq < self.PERCEPTION_RADIUS ** 2
+        i, dx, dy, d_sq = i[near], dx[near], dy[near], d_sq[near]
+
+        # SEPARATION: unit vectors away from close boids (stacked ones get a tiny random shove)
+        close = d_sq < self.SEPARATION_RADIUS ** 2
+        si, sdx, sdy = i[close], dx[close], dy[close]
+        d = np.sqrt(d_sq[close])
+        stacked = d < 0.001
+        d[stacked] = 1.0
+        sdx /= d
+        sdy /= d
+        if stacked.any():
+            jitter = self.rng.uniform(-0.1, 0.1, (int(stacked.sum()), 2))
+            sdx[stacked], sdy[stacked] = jitter[:, 0], jitter[:, 1]
+        sep_total = np.bincount(si, minlength=count)
+        has_sep = sep_total > 0
+        # astype: bincount hands back int64 zeros instead of float sums when no pair qualifies
+        sep = np.column_stack((np.bincount(si, sdx, count), np.bincount(si, sdy, count))).astype(np.float64, copy=False)
+        sep[has_sep] /= sep_total[has_sep, None]
+        tiny = has_sep & (np.einsum("ij,ij->i", sep, sep) < 0.0001)
+        sep[tiny] = self.rng.uniform(-0.1, 0.1, (int(tiny.sum()), 2))
+        sep = steer(sep, has_sep, vel, self.max_speed, self.max_force)
+
+        # COHESION: mean(x_j) - x_i == -mean(x_i - x_j)
+        total = np.bincount(i, minlength=count)
+        coh = np.column_stack((np.bincount(i, dx, count), np.bincount(i, dy, count))) / -np.maximum(total, 1)[:, None]
+        coh = steer(coh, total > 0, vel, self.max_speed, self.max_force)
+        return sep, coh
+
+    def avoid_walls(self, width, height):
+        """boid.avoid_walls for every row: full speed back inside on each axis past the margin."""
+        margin = self.WALL_MARGIN
+        desired = np.zeros_like(self.positions)
+        for axis, limit in ((0, width), (1, height)):
+            coord = self.positions[:, axis]
+            desired[coord < margin, axis] = self.max_speed
+            desired[coord > limit - margin, axis] = -self.max_speed
+        return steer(desired, np.ones(len(desired), dtype=bool), self.velocities, self.max_speed, self.max_force)
+
+    def steer(self, width, height):
+        sep, coh = self.flocking_forces()
+        self.accelerations += sep * (5 * 1.5) + coh * 0.5 + self.avoid_walls(width, height) * 2.0
+
+    def update(self):
+        """boid.update: integrate, cap at max_speed and keep everybody moving at >= 1 px/frame."""
+        self.velocities += self.accelerations
+        clamp_length(self.velocities, self.max_speed)
+        speed = lengths(self.velocities)
+        slow = (speed < 1) & (speed > 0)
+        self.velocities[slow] /= speed[slow, None]
+        self.positions += self.velocities
+        self.accelerations[:] = 0
+
+    def draw(self, screen):
+        # MenuBoid.draw's triangle, placed for the whole flock at once
+        speed = lengths(self.velocities)
+        moving = speed > 0
+        direction = self.velocities[moving] / speed[moving, None]
+        palette = self.PALETTE
+        colors = [palette[c] for c in self.colors[moving].tolist()]
+        MENU_BOID_SHAPE.draw(screen, self.positions[moving], direction, 1.0, colors=colors)
 
 def draw_custom_header(screen, title_text):
-    font = pygame.font.SysFont('Arial', 25)
-    symbol_font2 = pygame.font.SysFont('Arial', 12, bold=True)
+    font = get_font('Arial', 25)
+    symbol_font2 = get_font('Arial', 12, bold=True)
     HEADER_HEIGHT = 45
 
     # 1. Setup Colors
@@ -83,7 +184,7 @@ def draw_custom_header(screen, title_text):
     screen.blit(header_surf, (0, 0))
 
     # 4. RENDER TEXT
-    title_surf = font.render(title_text.upper(), True, title_color)
+    title_surf = render_text(font, title_text.upper(), title_color)
     screen.blit(title_surf, (constants.WIDTH // 2 - title_surf.get_width() // 2, 10))
 
     # 5. WINDOW CONTROLS LOGIC
@@ -103,8 +204,8 @@ def draw_custom_header(screen, title_text):
         pygame.draw.rect(screen, title_color, close_rect, 1)
         pygame.draw.rect(screen, title_color, min_rect, 1)
 
-        c_surf = symbol_font2.render("X", True, c_color)
-        m_surf = symbol_font2.render("—", True, m_color)
+        c_surf = render_text(symbol_font2, "X", c_color)
+        m_surf = render_text(symbol_font2, "—", m_color)
 
         screen.blit(c_surf, (close_rect.centerx - c_surf.get_width() // 2,
                              close_rect.centery - c_surf.get_height() // 2))
@@ -165,4 +266,78 @@ def draw_animated_dna(screen, center_x, start_y, height):
         # 2. Draw the two 'Sugar-Phosphate' backbones (the dots)
         # We draw x1 and x2 dots to represent the two strands
         pygame.draw.circle(screen, color, (int(x1), current_y), 4)
-        pygame.draw.circle(screen, color, (int(x2), current_y), 4)
\ No newline at end of file
+        pygame.draw.circle(screen, color, (int(x2), current_y), 4)
+
+class LayerCache:
+    """
+    Retained-mode screen layers: each named layer is composed once and reused until its key
+    (hover state, resolution...) changes, so static UI costs one blit per frame.
+    """
+    def __init__(self):
+        self.layers = {}   # name -> (key, surface)
+        self.builds = 0
+
+    def get(self, name, key, compose):
+        entry = self.layers.get(name)
+        if entry is None or entry[0] != key:
+            surface = compose()
+            # Match the display format once, so the per-frame blit is a straight copy
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+            entry = (key, surface)
+            self.layers[name] = entry
+            self.builds += 1
+        return entry[1]
+
+    def clear(self):
+        self.layers.clear()
+
+def compose_sidebar(title_font, sub_font, box1_rect, box2_rect, is_hover1, is_hover2):
+    """Sidebar panel, BIOSIM title and the two sim buttons, on a transparent full-height strip."""
+    layer = pygame.Surface((constants.SIDEBAR_WIDTH + 2, constants.HEIGHT), pygame.SRCALPHA)
+    pygame.draw.rect(layer, (20, 30, 45), (0, constants.HEADER_HEIGHT, constants.SIDEBAR_WIDTH, constants.HEIGHT))
+    pygame.draw.line(layer, (50, 100, 150), (constants.SIDEBAR_WIDTH, constants.HEADER_HEIGHT), (constants.SIDEBAR_WIDTH, constants.HEIGHT), 2)
+
+    title_rect = pygame.Rect(box1_rect.x, int(constants.HEIGHT * 0.12), box1_rect.w, box1_rect.h)
+    title_text = render_text(title_font, "BIOSIM", (255, 140, 0))
+    layer.blit(title_text, (title_rect.centerx - title_text.get_width()//2, title_rect.centery - title_text.get_height()//2))
+
+    # --- OCEAN / AERIAL BUTTONS ---
+    for rect, hover, colors, label in ((box1_rect, is_hover1, ((30, 100, 200), (25, 45, 70), (0, 212, 255)), "FISH SIM"),
+                                       (box2_rect, is_hover2, ((80, 150, 30), (35, 60, 35), (180, 255, 0)), "BIRD SIM")):
+        pygame.draw.rect(layer, colors[0] if hover else colors[1], rect, border_radius=15)
+        pygame.draw.rect(layer, colors[2], rect, 3, border_radius=15)
+        txt = render_text(sub_font, label, colors[2])
+        layer.blit(txt, (rect.centerx - txt.get_width()//2, rect.centery - txt.get_height()//2))
+    return layer
+
+def compose_about_box(sub_font, width, height, lines):
+    """The yellow-framed project description box."""
+    desc_surf = pygame.Surface((width, height))
+    pygame.draw.rect(desc_surf, (10, 15, 25, 0), (0, 0, width, height), border_radius=20)
+    pygame.draw.rect(desc_surf, (255, 255, 0), (0, 0, width, height), 3, border_radius=20)
+    for i, line in enumerate(lines):
+        text_surf = sub_font.render(line, True, (255, 255, 0))
+        text_x = (width // 2) - (text_surf.get_width() // 2)
+        desc_surf.blit(text_surf, (text_x, int(height * 0.15) + (i * int(constants.HEIGHT * 0.045))))
+    return desc_surf
+
+def compose_info_overlay(title_font, sub_font, title, fill, accent, instructions):
+    """Full-screen dimming overlay with a preview screen's info box, title and instructions."""
+    layer = pygame.Surface((constants.WIDTH, constants.HEIGHT), pygame.SRCALPHA)
+    layer.fill((0, 0, 0, 200))
+
+    # Scaled Info Box
+    info_rect = pygame.Rect(constants.WIDTH//2 - int(constants.WIDTH*0.2), constants.HEIGHT//2 - int(constants.HEIGHT*0.25), int(constants.WIDTH*0.4), int(constants.HEIGHT*0.5))
+    pygame.draw.rect(layer, fill, info_rect, border_radius=20)
+    pygame.draw.rect(layer, accent, info_rect, 3, border_radius=20)
+
+    title_surf = title_font.render(title, True, accent)
+    layer.blit(title_surf, (info_rect.centerx - title_surf.get_width()//2, info_rect.y + int(constants.HEIGHT * 0.03)))
+
+    # Scaled vertical shift for simple if/else logic
+    start_y_offset = (info_rect.centery - (len(instructions) * int(constants.HEIGHT*0.04)) // 2) - int(constants.HEIGHT*0.03)
+    for i, line in enumerate(instructions):
+        text_surf = sub_font.render(line, True, accent)
+        layer.blit(text_surf, (info_rect.x + int(constants.WIDTH*0.02), start_y_offset + (i * int(constants.HEIGHT * 0.045))))
+    return layer
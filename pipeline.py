@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from profiler import PhaseTimer
+
+class SimPipeline:
+    """
+    Overlaps simulation and drawing: while the main thread draws frame N from a snapshot, the
+    steps for frame N+1 run on one worker thread. The sim's live arrays are the back buffer
+    (written only by the worker); the snapshot taken at each frame boundary is the front buffer
+    (read only by the renderer). The big array kernels release the GIL, so the two mostly overlap.
+
+    Per frame:  view = swap()  ->  touch the sim (events)  ->  submit(steps)  ->  view.draw(...)
+    Between submit() and the next swap() the sim belongs to the worker: don't read or change it.
+    Drawing a snapshot shows the state one frame later than a serial loop would.
+
+    The worker laps the step phases into its own PhaseTimer (sim.timer); swap() adds them to
+    `timer` as "sim.<phase>", so the overlay still breaks the steps down. Those phases ran
+    alongside the previous frame's draw, so the stack can add up to more than the frame time.
+    """
+    def __init__(self, sim, timer=None):
+        self.sim = sim
+        self.timer = timer            # Lap timer for the snapshot's draw phases (main thread)
+        self.step_timer = PhaseTimer()   # The sim's step phases, lapped on the worker
+        sim.timer = self.step_timer
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sim")
+        self.pending = None
+        self.recorder = None          # trajectory.TrajectoryWriter fed every step, if set (closed by close())
+
+    def _run(self, steps):
+        recorder, timer = self.recorder, self.sim.timer
+        for _ in range(steps):
+            timer.begin()
+            self.sim.step()
+            if recorder is not None:
+                recorder.record(self.sim)
+
+    def wait(self):
+        """Blocks until the steps in flight are done (re-raising anything they raised)."""
+        if self.pending is None: return
+        pending, self.pending = self.pending, None
+        pending.result()
+
+    def swap(self):
+        """Frame boundary: waits for the worker, then returns a snapshot of its result to draw."""
+        self.wait()
+        view = self.sim.snapshot()
+        if self.timer is not None:
+            totals = self.timer.totals
+            for name, seconds in self.step_timer.totals.items():
+                totals[f"sim.{name}"] = totals.get(f"sim.{name}", 0.0) + seconds
+            view.timer = self.timer
+        self.step_timer.reset()
+        return view
+
+    def submit(self, steps):
+        """Starts `steps` sim steps on the worker thread (no-op for 0)."""
+        if steps:
+            # Set here, not in _run: the overlay is toggled on the main thread
+            self.step_timer.enabled = self.timer is not None and self.timer.enabled
+            self.pending = self.executor.submit(self._run, steps)
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from fonts import get_font
+
+class PhaseTimer:
+    """
+    Lap timer for the hot sections of a frame.
+    Call begin() at the top of the frame, then lap("name") right after each phase:
+    the time since the previous lap is charged to that phase.
+    When disabled, begin()/lap() return immediately, so the calls can stay in the loops.
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.totals = {}   # phase name -> accumulated seconds
+        self.frames = 0
+        self._last = 0.0
+
+    def begin(self):
+        if not self.enabled: return
+        self.frames += 1
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        if not self.enabled: return
+        now = time.perf_counter()
+        self.totals[name] = self.totals.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+    def reset(self):
+        self.totals.clear()
+        self.frames = 0
+
+    def averages_ms(self):
+        """Mean milliseconds per frame for every phase seen so far."""
+        frames = max(self.frames, 1)
+        return {name: total * 1000.0 / frames for name, total in self.totals.items()}
+
+class StartupTimer:
+    """
+    Milestones from launch to the first presented frame (imports, display, fonts, first frame...).
+    mark("name") stamps the time since `start`; marks may come from other threads (audio).
+    report() writes one line per launch when BIOSIM_STARTUP_REPORT is set: "1" prints it,
+    anything else is a file path that gets one JSON record appended, so packaged builds
+    (no console) can still be tracked run over run.
+    """
+    ENV = "BIOSIM_STARTUP_REPORT"
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}   # name -> ms since start
+
+    def mark(self, name):
+        self.marks.setdefault(name, (time.perf_counter() - self.start) * 1000.0)
+
+    def summary(self):
+        return " ".join(f"{name}={ms:.1f}ms" for name, ms in self.marks.items())
+
+    def report(self, target=None):
+        target = target if target is not None else os.environ.get(self.ENV)
+        if not target: return
+        if target == "1":
+            if sys.stdout is not None:
+                print(f"startup: {self.summary()}", flush=True)
+            return
+        record = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "frozen": bool(getattr(sys, "frozen", False)),
+                  "marks_ms": dict(self.marks)}
+        with open(target, "a") as fh:
+            fh.write(json.dumps(record) + "\n")
+
+class FrameProfiler:
+    """
+    Toggleable in-app overlay (F3): rolling frame time, p50/p95/p99 and a stacked
+    per-phase breakdown of the last few seconds. Phases come from the same lap() calls
+    the sims already make through their PhaseTimer, so switching this off leaves
+    only the early-return cost of those calls.
+    """
+    HISTORY = 180        # Frames kept for the graph / percentiles (3s at 60 FPS)
+    GRAPH_MS = 33.3      # Graph height represents two 60 FPS frames
+    TOGGLE_KEY = pygame.K_F3
+    PALETTE = [(0, 212, 255), (255, 140, 0), (0, 255, 0), (255, 80, 120), (180, 120, 255),
+               (255, 230, 90), (90, 200, 170), (200, 200, 200), (255, 160, 200), (120, 160, 255)]
+
+    def __init__(self):
+        self.timer = PhaseTimer()
+        self.frame_ms = deque(maxlen=self.HISTORY)
+        self.phase_ms = deque(maxlen=self.HISTORY)
+        self.colors = {}
+        self.font = None
+        self._frame_start = None
+
+    @property
+    def enabled(self):
+        return self.timer.enabled
+
+    def toggle(self):
+        self.timer.enabled = not self.timer.enabled
+        self.frame_ms.clear()
+        self.phase_ms.clear()
+        self._frame_start = None
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == self.TOGGLE_KEY:
+            self.toggle()
+
+    def lap(self, name):
+        self.timer.lap(name)
+
+    def begin_frame(self):
+        """Closes the previous frame's record and starts timing a new one."""
+        if not self.timer.enabled: return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_ms.append((now - self._frame_start) * 1000.0)
+            self.phase_ms.append({name: total * 1000.0 for name, total in self.timer.totals.items()})
+        self._frame_start = now
+        self.timer.reset()
+        self.timer.begin()
+
+    def color_of(self, name):
+        if name not in self.colors:
+            self.colors[name] = self.PALETTE[len(self.colors) % len(self.PALETTE)]
+        return self.colors[name]
+
+    def draw(self, screen, pos=(10, 55)):
+        if not self.timer.enabled or not self.frame_ms: return
+        if self.font is None:
+            self.font = get_font(["consolas", "dejavusansmono", "couriernew", "monospace"], 14)
+
+        frames = np.fromiter(self.frame_ms, dtype=np.float64)
+        p50, p95, p99 = np.percentile(frames, [50, 95, 99])
+        names = list(dict.fromkeys(name for record in self.phase_ms for name in record))
+        averages = {name: sum(r.get(name, 0.0) for r in self.phase_ms) / len(self.phase_ms) for name in names}
+
+        # 1. PANEL
+        graph_w, graph_h = self.HISTORY * 2, 90
+        line_h = self.font.get_linesize()
+        panel_w = graph_w + 20
+        panel_h = graph_h + line_h * (3 + len(names)) + 20
+        panel = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
+        panel.fill((10, 20, 35, 210))
+
+        # 2. HEADLINE NUMBERS
+        lines = [(f"FRAME {frames[-1]:6.2f} ms   avg {frames.mean():6.2f} ms ({1000.0 / frames.mean():5.1f} FPS)", (255, 255, 255)),
+                 (f"p50 {p50:6.2f}   p95 {p95:6.2f}   p99 {p99:6.2f} ms", (255, 255, 0))]
+        y = 8
+        for text, color in lines:
+            panel.blit(self.font.render(text, True, color), (10, y))
+            y += line_h
+
+        # 3. STACKED GRAPH: one 2px column per frame, one colored segment per phase
+        graph_top = y + 4
+        scale = graph_h / self.GRAPH_MS
+        pygame.draw.line(panel, (80, 80, 80), (10, graph_top + graph_h - 16.7 * scale), (10 + graph_w, graph_top + graph_h - 16.7 * scale))
+        for i, record in enumerate(self.phase_ms):
+            x = 10 + i * 2
+            bottom = graph_top + graph_h
+            for name in names:
+                height = record.get(name, 0.0) * scale
+                if height <= 0: continue
+                top = max(graph_top, bottom - height)
+                pygame.draw.line(panel, self.color_of(name), (x, bottom), (x, top), 2)
+                bottom = top
+                if bottom <= graph_top: break
+        y = graph_top + graph_h + 6
+
+        # 4. LEGEND (mean ms per phase)
+        for name in names:
+            color = self.color_of(name)
+            pygame.draw.rect(panel, color, (10, y + 3, 10, 10))
+            panel.blit(self.font.render(f"{name:<16}{averages[name]:7.2f} ms", True, color), (26, y))
+            y += line_h
+
+        screen.blit(panel, pos)
@@ -0,0 +1,62 @@
+"""
+Trajectory viewer: plays a file written by `headless.py --record` (or F7 in the app) without
+running the simulation.
+
+    python replay.py fishnado.traj                  # SPACE pause, LEFT/RIGHT seek 1s, HOME/END, ESC quit
+    python replay.py hunt.traj --start 1800 --fps 30
+"""
+import argparse
+
+import pygame
+
+import constants
+from fonts import get_font
+from trajectory import TrajectoryReader
+
+SEEK_KEYS = {pygame.K_LEFT: -60, pygame.K_RIGHT: 60, pygame.K_DOWN: -600, pygame.K_UP: 600}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Bio-Sim trajectory.")
+    parser.add_argument("path")
+    parser.add_argument("--start", type=int, default=0, help="first frame to show")
+    parser.add_argument("--fps", type=int, default=constants.FPS)
+    args = parser.parse_args(argv)
+
+    reader = TrajectoryReader(args.path)
+    if not len(reader):
+        raise SystemExit(f"{args.path}: no frames recorded")
+    pygame.display.init()
+    pygame.display.set_caption(f"Bio-Sim replay - {args.path}")
+    screen = pygame.display.set_mode((reader.width, reader.height))
+    constants.configure(reader.width, reader.height)
+    sim = reader.make_sim()
+    font = get_font(["consolas", "dejavusansmono", "couriernew", "monospace"], 16)
+    clock = pygame.time.Clock()
+
+    number, paused, running = min(max(args.start, 0), len(reader) - 1), False, True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE: running = False
+                elif event.key == pygame.K_SPACE: paused = not paused
+                elif event.key == pygame.K_HOME: number = 0
+                elif event.key == pygame.K_END: number = len(reader) - 1
+                elif event.key in SEEK_KEYS: number = min(max(number + SEEK_KEYS[event.key], 0), len(reader) - 1)
+
+        frame = reader.frame(number)
+        reader.apply(frame, sim)
+        sim.draw(screen)
+        status = f"{reader.kind} mode {frame.mode}  frame {number + 1}/{len(reader)}{'  PAUSED' if paused else ''}"
+        # A new string every frame: rendered directly, not through the TEXT_CACHE (see fonts.py)
+        screen.blit(font.render(status, True, (255, 255, 255)), (10, 10))
+        pygame.display.flip()
+        clock.tick(args.fps)
+        if not paused and number < len(reader) - 1:
+            number += 1
+
+    reader.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
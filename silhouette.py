@@ -0,0 +1,76 @@
+import numpy as np
+import pygame
+
+class Silhouette:
+    """
+    A species' look defined once in local space, then placed for many agents in one batch.
+    Local points are (forward, side) offsets at size 1, optionally with a third `flap` term:
+    the side offset grows by flap * flap_factor, so flapping wings stay in the template too.
+
+    Parts are drawn in order, for each agent:
+      ("polygon", color, [points...])
+      ("line", color, [start, end])            -- width given at draw time
+      ("circle", color, point, radius)         -- radius in local units, truncated like int(r * s)
+    """
+    def __init__(self, parts):
+        base, flap, self.parts = [], [], []
+        for kind, color, *geometry in parts:
+            points = geometry[0] if kind != "circle" else [geometry[0]]
+            start = len(base)
+            for p in points:
+                base.append((p[0], p[1]))
+                flap.append((0.0, p[2] if len(p) > 2 else 0.0))
+            radius = geometry[1] if kind == "circle" else None
+            self.parts.append((kind, color, start, len(base), radius))
+        self.base = np.array(base, dtype=np.float64)
+        self.flap = np.array(flap, dtype=np.float64)
+        self.flaps = bool(self.flap.any())
+
+    def vertices(self, positions, forwards, scales, flaps=None):
+        """
+        Every template vertex for every agent: (N, K, 2) screen points.
+        positions/forwards are (N, 2) (forwards unit length), scales and flaps are (N,) or scalars.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        forwards = np.asarray(forwards, dtype=np.float64).reshape(-1, 2)
+        count = len(positions)
+        scales = np.broadcast_to(np.asarray(scales, dtype=np.float64), (count,))
+        local = self.base[None, :, :]
+        if self.flaps and flaps is not None:
+            flaps = np.broadcast_to(np.asarray(flaps, dtype=np.float64), (count,))
+            local = local + flaps[:, None, None] * self.flap[None, :, :]
+        f = forwards[:, None, :]
+        side = np.stack((-forwards[:, 1], forwards[:, 0]), axis=1)[:, None, :]
+        # One rotation + zoom + translation for every vertex of every agent
+        return positions[:, None, :] + (f * local[..., 0:1] + side * local[..., 1:2]) * scales[:, None, None]
+
+    def draw(self, screen, positions, forwards, scales, flaps=None, colors=None, line_width=1):
+        """Draws every agent; `colors` (one per agent) overrides the template colors."""
+        count = len(positions)
+        if count == 0: return
+        verts = self.vertices(positions, forwards, scales, flaps)
+        scales = np.broadcast_to(np.asarray(scales, dtype=np.float64), (count,))
+        polygon, line, circle = pygame.draw.polygon, pygame.draw.line, pygame.draw.circle
+
+        # Per part, one list of every agent's points (no per-agent slicing in the loop below)
+        calls = []
+        for kind, color, lo, hi, radius in self.parts:
+            if kind == "circle":
+                centers = verts[:, lo].astype(np.intp).tolist()
+                radii = (radius * scales).astype(np.intp).tolist()
+                calls.append((circle, color, centers, radii))
+            elif kind == "line":
+                calls.append((line, color, verts[:, lo].tolist(), verts[:, lo + 1].tolist()))
+            else:
+                calls.append((polygon, color, verts[:, lo:hi].tolist(), None))
+
+        agent_colors = colors if colors is not None else [None] * count
+        for k, agent_color in enumerate(agent_colors):
+            for draw, color, first, second in calls:
+                color = agent_color or color
+                if second is None:
+                    draw(screen, color, first[k])
+                elif draw is line:
+                    draw(screen, color, first[k], second[k], line_width)
+                else:
+                    draw(screen, color, first[k], second[k])
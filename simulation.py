@@ -0,0 +1,302 @@
+import copy
+import random
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+from boid1 import FishSchool, PredatorFish
+from boid2 import Flock, PredatorBird
+from environment import WaterEffects
+from profiler import PhaseTimer
+from sprites import SurfaceCache
+from spatial import CellIndex, DepthOrder
+import constants
+
+# Simulation state + stepping, with no window, event loop or frame cap attached.
+# fish_main/bird_main drive these interactively; headless.py drives them flat out.
+
+def frozen(obj, **copies):
+    """Shallow copy of `obj` with the given attributes replaced (by private copies, typically)."""
+    view = copy.copy(obj)
+    view.__dict__.update(copies)
+    return view
+
+# --- OCEAN SIMULATION ---
+class FishSim:
+    KIND = "fish"
+
+    def __init__(self, width, height, fish_num=constants.FISH_COUNT, skin=constants.FISH_NEIGHBOR_SKIN,
+                 workers=constants.FISH_WORKERS):
+        """workers > 0 steps the school in that many processes, one world tile each (see tiles.py)."""
+        self.width, self.height = width, height
+        self.water = WaterEffects(width, height, constants.WATER_GRID_SIZE)
+        if workers:
+            from tiles import TiledSchool
+            self.school = TiledSchool(fish_num, width, height, workers)
+        else:
+            self.school = FishSchool(fish_num, width, height, skin)
+        self.center = pygame.Vector2(width // 2, height // 2)
+        self.mode = 1
+        self.predators = []
+        # Scaled grid size
+        self.cell_size = int(height * 0.08)
+        # Coarser index for the sharks' 5x5 prey check (the school keeps its own 50px one)
+        self.prey_index = CellIndex(self.cell_size, (0, 0, width, height))
+        # Per-phase lap timer (off unless a benchmark/profiler switches it on)
+        self.timer = PhaseTimer()
+        # Positions before the latest step, for drawing between steps (see interpolated)
+        self.previous = None
+        self.steps = 0   # Steps taken: the animation clock (see animation_ms)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode == 1:
+            self.school.set_limits(0.8, 0.03)
+            return
+        if not self.predators:
+            # Scaled predator gates
+            offset = int(self.width * 0.1)
+            gates = [pygame.Vector2(-offset, -offset), pygame.Vector2(self.width+offset, -offset),
+                     pygame.Vector2(-offset, self.height+offset), pygame.Vector2(self.width+offset, self.height+offset)]
+            self.predators = [PredatorFish(g.x, g.y) for g in gates]
+        self.school.set_limits(*((3.5, 0.1) if mode == 2 else (5.0, 0.2)))
+
+    def handle_key(self, key):
+        if key == pygame.K_1:
+            self.set_mode(1)
+        elif key in [pygame.K_2, pygame.K_3]:
+            self.set_mode(2 if key == pygame.K_2 else 3)
+
+    def step(self):
+        mode, school, predators, timer = self.mode, self.school, self.predators, self.timer
+        self.previous = (school.positions.copy(), [pygame.Vector2(p.position) for p in predators])
+        self.steps += 1
+        self.prey_index.update(school.positions)
+        school.find_neighbors()
+        timer.lap("grid")
+        self.water.update(predators, school)
+        # Two-way coupling: the wakes just deposited drag on everybody swimming through them
+        school.drag(self.water.sample(school.positions))
+        if predators:
+            flow = self.water.sample(np.array([(p.position.x, p.position.y) for p in predators]))
+            for p, (fx, fy) in zip(predators, flow.tolist()):
+                p.apply_force((pygame.Vector2(fx, fy) - p.velocity) * p.water_drag)
+        timer.lap("water")
+
+        for p in predators:
+            p.apply_force(p.predator_separation(predators) * 2)
+            if mode == 1:
+                # Scaled idle point
+                p.apply_force((pygame.Vector2(-int(self.width*0.3), -int(self.height*0.5)) - p.position).normalize() * p.max_speed - p.velocity)
+            elif mode == 3:
+                p.is_bursting = False
+                p.max_speed = 4
+                to_center = (self.center - p.position)
+                if to_center.length() > 0.001:
+                    orbit_dir = pygame.Vector2(-to_center.y, to_center.x).normalize()
+                    p.apply_force(orbit_dir * 1.5 + to_center.normalize() * ((to_center.length() - int(self.height*0.25)) * 0.02))
+            else:
+                p.apply_force(p.hunt(school))
+
+            p.update(mode, self.prey_index)
+            if mode != 1: p.bounce_edges(self.width, self.height)
+        timer.lap("predators")
+
+        # Whole school steps at once: separation/cohesion/alignment, mode forces, bounce_edges
+        school.steer(mode, predators, self.center, int(self.height * 0.12))
+        timer.lap("steering")
+        school.integrate(self.width, self.height)
+        timer.lap("integration")
+
+    def animation_ms(self, alpha=1.0):
+        """
+        Sim time in ms, `alpha` of the way through the latest step. Tail sway, wing flap and light
+        rays run on this instead of the wall clock, so they move at sim speed in export.py too
+        and an interpolated frame shows them in step with the positions.
+        """
+        return max(self.steps - 1 + alpha, 0.0) * 1000.0 / constants.SIM_RATE
+
+    def neighbor_stats(self):
+        """Verlet list hit/rebuild counters, or None when the list is off."""
+        return self.school.neighbor_list.stats() if self.school.neighbor_list else None
+
+    def tile_stats(self):
+        """Tile layout, ghost rows and migrations of a multi-process school, or None when it is off."""
+        return self.school.stats() if hasattr(self.school, "tiles") else None
+
+    def close(self):
+        """Releases the school's worker processes and shared memory, if it has any."""
+        self.school.close()
+
+    def snapshot(self):
+        """
+        A frozen copy of what draw() reads, safe to draw while the next step() runs on another
+        thread: the arrays, vectors and bubbles a step mutates are copied, everything else
+        (surfaces, sprite caches, per-fish sway constants) is shared.
+        """
+        view = copy.copy(self)
+        view.school = frozen(self.school, positions=self.school.positions.copy(),
+                             velocities=self.school.velocities.copy())
+        view.predators = [frozen(p, position=pygame.Vector2(p.position), velocity=pygame.Vector2(p.velocity))
+                          for p in self.predators]
+        view.water = self.water.snapshot()
+        return view
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """Moves every swimmer `alpha` of the way from its previous-step position to its current one
+        for the duration of the block (alpha = 1: the latest state, untouched)."""
+        if alpha >= 1.0 or self.previous is None:
+            yield
+            return
+        school, predators = self.school, self.predators
+        prev_positions, prev_predators = self.previous
+        positions, saved = school.positions, [p.position for p in predators]
+        school.positions = prev_positions + (positions - prev_positions) * alpha
+        if len(prev_predators) == len(predators):   # sharks that just spawned have no past
+            for p, prev in zip(predators, prev_predators):
+                p.position = prev.lerp(p.position, alpha)
+        try:
+            yield
+        finally:
+            school.positions = positions
+            for p, position in zip(predators, saved):
+                p.position = position
+
+    def draw(self, screen, alpha=1.0):
+        with self.interpolated(alpha):
+            ticks = self.animation_ms(alpha)
+            self.water.draw(screen, ticks)
+            self.timer.lap("water_draw")
+            for p in self.predators:
+                p.draw(screen, ticks)
+            self.timer.lap("predator_draw")
+            self.school.draw(screen, ticks)
+            self.timer.lap("fish_draw")
+
+# --- AERIAL SIMULATION ---
+class BirdSim:
+    KIND = "bird"
+    CLOUD_QUANTUM = 8   # Cloud sizes are rounded to this many px, so zooming reuses surfaces
+
+    def __init__(self, width, height, bird_num=constants.BIRD_COUNT, skin=constants.BIRD_NEIGHBOR_SKIN):
+        self.width, self.height = width, height
+        self.mode = "SCOUT"
+        self.birds = Flock(bird_num, width, height, skin)
+        self.predator = PredatorBird(width // 2, height // 2)
+        # Scaled grid size
+        self.cell_size = int(height * 0.18)
+        # Per-phase lap timer (off unless a benchmark/profiler switches it on)
+        self.timer = PhaseTimer()
+        self.current_zoom, self.target_zoom = 0.6, 0.6
+        # Back-to-front bird order, repaired from last frame's instead of re-sorted
+        self.depth = DepthOrder()
+        # Positions and zoom before the latest step, for drawing between steps (see interpolated)
+        self.previous = None
+        self.steps = 0   # Steps taken: the animation clock (see FishSim.animation_ms)
+        self.cloud_cache = SurfaceCache(constants.CLOUD_CACHE_MB << 20)
+        # Scaled cloud bounds
+        self.clouds = [{'pos': pygame.Vector2(random.randint(-int(width*1.5), int(width*2.5)), random.randint(-int(height*2.5), int(height*4))),
+                        'size': random.randint(int(height*0.5), int(height*1.1)), 'depth': random.uniform(0.1, 0.4)} for _ in range(30)]
+
+    def set_mode(self, mode):
+        self.mode = mode
+
+    def handle_key(self, key):
+        if key == pygame.K_t: self.set_mode("HUNT" if self.mode == "SCOUT" else "SCOUT")
+
+    def step(self):
+        birds, predator, timer = self.birds, self.predator, self.timer
+        self.previous = (birds.positions.copy(), pygame.Vector2(predator.position), self.current_zoom)
+        self.steps += 1
+        self.target_zoom = 1.2 if self.mode == "HUNT" else 0.6
+        self.current_zoom += (self.target_zoom - self.current_zoom) * 0.05
+
+        flock_center = birds.center(pygame.Vector2(self.width//2, self.height//2))
+        target = predator.target_bird if self.mode == "HUNT" else None
+        birds.find_neighbors(self.cell_size)
+        timer.lap("grid")
+        birds.steer(self.width, self.height, self.cell_size, flock_center, target, predator, self.animation_ms())
+        timer.lap("steering")
+        birds.integrate(target)
+        timer.lap("integration")
+        predator.update(self.mode, birds, flock_center, self.width, self.height)
+        timer.lap("predator")
+
+    def animation_ms(self, alpha=1.0):
+        """Sim time in ms, `alpha` of the way through the latest step (see FishSim.animation_ms)."""
+        return max(self.steps - 1 + alpha, 0.0) * 1000.0 / constants.SIM_RATE
+
+    def neighbor_stats(self):
+        """Verlet list hit/rebuild counters, or None when the list is off."""
+        return self.birds.neighbor_list.stats() if self.birds.neighbor_list else None
+
+    def close(self):
+        """Nothing to release; here so callers can close() either sim."""
+
+    def cloud_surface(self, size):
+        """Soft cloud ellipse about `size` px wide, shared by every cloud of that (quantized) size."""
+        size = max(self.CLOUD_QUANTUM, int(round(size / self.CLOUD_QUANTUM)) * self.CLOUD_QUANTUM)
+        surface = self.cloud_cache.get(size)
+        if surface is None:
+            surface = pygame.Surface((size, size // 2), pygame.SRCALPHA)
+            pygame.draw.ellipse(surface, (255, 255, 255, 50), (0, 0, size, size // 2))
+            self.cloud_cache.put(size, surface, surface)
+        return surface
+
+    def snapshot(self):
+        """
+        A frozen copy of what draw() reads, safe to draw while the next step() runs on another
+        thread (see FishSim.snapshot). The falcon's smoothed heading is only ever touched by
+        draw(), so it stays shared and keeps easing from frame to frame.
+        """
+        view = copy.copy(self)
+        birds, predator = self.birds, self.predator
+        view.birds = frozen(birds, positions=birds.positions.copy(), velocities=birds.velocities.copy(),
+                            flap_speed=birds.flap_speed.copy())
+        view.predator = frozen(predator, position=pygame.Vector2(predator.position),
+                               velocity=pygame.Vector2(predator.velocity))
+        return view
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """Moves the flock, the falcon and the camera zoom `alpha` of the way from the previous
+        step to the current one for the duration of the block (alpha = 1: the latest state)."""
+        if alpha >= 1.0 or self.previous is None:
+            yield
+            return
+        birds, predator = self.birds, self.predator
+        prev_positions, prev_falcon, prev_zoom = self.previous
+        saved = birds.positions, predator.position, self.current_zoom
+        birds.positions = prev_positions + (birds.positions - prev_positions) * alpha
+        predator.position = prev_falcon.lerp(predator.position, alpha)
+        self.current_zoom = prev_zoom + (self.current_zoom - prev_zoom) * alpha
+        try:
+            yield
+        finally:
+            birds.positions, predator.position, self.current_zoom = saved
+
+    def draw(self, screen, alpha=1.0):
+        with self.interpolated(alpha):
+            birds, predator, zoom = self.birds, self.predator, self.current_zoom
+            screen.fill((110, 160, 230))
+
+            # Parallax Clouds: one cached ellipse per quantized size, all blitted in one call
+            blits = []
+            for c in self.clouds:
+                rel_x = (c['pos'].x - predator.position.x * c['depth']) * zoom + (self.width // 2)
+                rel_y = (c['pos'].y - predator.position.y * c['depth']) * zoom + (self.height // 2)
+                scaled_size = int(c['size'] * zoom)
+                if -scaled_size < rel_x < self.width + scaled_size:
+                    blits.append((self.cloud_surface(scaled_size), (rel_x, rel_y)))
+            screen.blits(blits, doreturn=False)
+            self.timer.lap("cloud_draw")
+
+            # Depth order: birds sorted by y, with the predator slotted in at its own height
+            order = self.depth.update(birds.positions[:, 1])
+            split = self.depth.split(predator.position.y)
+            ticks = self.animation_ms(alpha)
+            birds.draw(screen, predator.position, zoom, self.width, self.height, ticks, order, split,
+                       lambda: predator.draw(screen, zoom, self.width, self.height, ticks))
+            self.timer.lap("bird_draw")
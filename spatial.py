@@ -0,0 +1,233 @@
+import numpy as np
+
+class CellIndex:
+    """
+    Persistent sorted cell list over a fixed world rectangle.
+    Replaces the per-frame dict of tuple keys + Python lists (build_spatial_grid) with flat arrays:
+      cell_ids : grid cell of every agent (column-major: id = grid_x * rows + grid_y)
+      order    : permutation that groups agents by cell
+      starts   : per-cell offsets into `order` (cell c owns order[starts[c]:starts[c + 1]])
+    Agents outside the rectangle are clamped into the border cells. Clamping never pushes two
+    agents further apart in cell space, so neighborhood queries stay complete; far outliers
+    only cost a few extra candidates.
+    """
+    PAIR_BLOCK = 1 << 19   # Candidate pairs per pair_blocks() block: ~4MB per index array
+
+    def __init__(self, cell_size, bounds):
+        """
+        :param cell_size: Width of one grid bucket in pixels.
+        :param bounds: (x0, y0, x1, y1) world rectangle the grid covers.
+        """
+        x0, y0, x1, y1 = bounds
+        self.cell_size = cell_size
+        self.origin = np.array((x0, y0), dtype=np.float64)
+        self.cols = int((x1 - x0) // cell_size) + 1
+        self.rows = int((y1 - y0) // cell_size) + 1
+        # Radix sort kicks in for 16-bit keys, which makes the argsort a counting sort
+        self.key_type = np.uint16 if self.cols * self.rows <= 1 << 16 else np.int64
+
+        self.cell_xy = None
+        self.cell_ids = None
+        self.order = np.empty(0, dtype=np.intp)
+        self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.order)
+
+    def cell_of(self, x, y):
+        return int((x - self.origin[0]) // self.cell_size), int((y - self.origin[1]) // self.cell_size)
+
+    def update(self, positions):
+        """Re-buckets every agent. Cheap when few agents changed cell since the last update."""
+        cell_xy = np.floor_divide(positions - self.origin, self.cell_size).astype(np.intp)
+        np.clip(cell_xy[:, 0], 0, self.cols - 1, out=cell_xy[:, 0])
+        np.clip(cell_xy[:, 1], 0, self.rows - 1, out=cell_xy[:, 1])
+        cell_ids = (cell_xy[:, 0] * self.rows + cell_xy[:, 1]).astype(self.key_type)
+
+        if self.cell_ids is not None and len(cell_ids) == len(self.cell_ids):
+            if np.array_equal(cell_ids, self.cell_ids):
+                # Nobody crossed a cell border: permutation and offsets are still valid
+                self.cell_xy = cell_xy
+                return
+            # INCREMENTAL: re-sort the previous permutation. The keys are already almost in order,
+            # which is the best case for both the radix and the timsort path of a stable argsort.
+            self.order = self.order[np.argsort(cell_ids[self.order], kind="stable")]
+        else:
+            self.order = np.argsort(cell_ids, kind="stable")
+
+        self.cell_xy, self.cell_ids = cell_xy, cell_ids
+        counts = np.bincount(cell_ids, minlength=self.cols * self.rows)
+        np.cumsum(counts, out=self.starts[1:])
+
+    def _column_ranges(self, gx, gy, dx, reach):
+        """Start/end offsets of column gx + dx, rows gy - reach .. gy + reach (empty off the grid)."""
+        column = gx + dx
+        on_grid = (column >= 0) & (column < self.cols)
+        column = np.clip(column, 0, self.cols - 1)
+        lo_y = np.clip(gy - reach, 0, self.rows - 1)
+        hi_y = np.clip(gy + reach, -1, self.rows - 1)
+        lo = self.starts[column * self.rows + lo_y]
+        hi = self.starts[column * self.rows + hi_y + 1]
+        hi = np.where(on_grid & (hi_y >= lo_y), hi, lo)
+        return lo, hi
+
+    def pairs(self, reach=1):
+        """
+        (i, j) index arrays for every pair of indexed agents whose cells lie within `reach`
+        cells of each other (reach=1 is the classic 3x3 lookup). Self pairs are left out,
+        so callers only have to filter by distance.
+        """
+        ranges = self._all_ranges(reach)
+        return self._block_pairs(ranges, 0, len(self.order))
+
+    def pair_blocks(self, reach=1, stop=None, block=None):
+        """
+        pairs(reach) in blocks of consecutive agents (0 .. `stop`, default all), each holding at
+        most about `block` pairs (PAIR_BLOCK) and never splitting one agent's pairs. Reducing
+        block by block keeps the memory at O(N + block) however dense the crowd gets, where a
+        single pairs() call grows with N times the agents per 3x3 window.
+        """
+        count = len(self.order) if stop is None else stop
+        if count == 0: return
+        block = block or self.PAIR_BLOCK
+        ranges = self._all_ranges(reach)
+        ends = np.cumsum(sum(hi[:count] - lo[:count] for lo, hi in ranges))
+        start = 0
+        while start < count:
+            done = int(ends[start - 1]) if start else 0
+            stop_at = max(int(np.searchsorted(ends, done + block, side="right")), start + 1)
+            yield self._block_pairs(ranges, start, min(stop_at, count))
+            start = stop_at
+
+    def _all_ranges(self, reach):
+        """(lo, hi) offsets into `order` of every agent's column runs, one per column offset."""
+        if len(self.order) == 0:
+            return []
+        gx, gy = self.cell_xy[:, 0], self.cell_xy[:, 1]
+        return [self._column_ranges(gx, gy, dx, reach) for dx in range(-reach, reach + 1)]
+
+    def _block_pairs(self, ranges, start, stop):
+        pair_i, pair_j = [], []
+        agent_ids = np.arange(start, stop)
+        # For each column offset the rows above/below are one contiguous run of `order`,
+        # so a 3x3 lookup is 3 range reads instead of 9 dict hits
+        for lo, hi in ranges:
+            lo, hi = lo[start:stop], hi[start:stop]
+            sizes = hi - lo
+            total = int(sizes.sum())
+            if total == 0:
+                continue
+            first = np.repeat(lo - (np.cumsum(sizes) - sizes), sizes)
+            pair_i.append(np.repeat(agent_ids, sizes))
+            pair_j.append(self.order[first + np.arange(total)])
+
+        if not pair_i:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        i = np.concatenate(pair_i)
+        j = np.concatenate(pair_j)
+        not_self = i != j
+        return i[not_self], j[not_self]
+
+    def _point_ranges(self, x, y, reach):
+        gx, gy = self.cell_of(x, y)
+        for dx in range(-reach, reach + 1):
+            column = gx + dx
+            if not 0 <= column < self.cols: continue
+            lo_y, hi_y = max(gy - reach, 0), min(gy + reach, self.rows - 1)
+            if hi_y < lo_y: continue
+            yield self.starts[column * self.rows + lo_y], self.starts[column * self.rows + hi_y + 1]
+
+    def count_near(self, point, reach=1):
+        """How many agents sit in the (2 * reach + 1)^2 cells around `point` (3x3, 5x5, 7x7...)."""
+        return int(sum(hi - lo for lo, hi in self._point_ranges(point[0], point[1], reach)))
+
+    def near(self, point, reach=1):
+        """Indices of the agents in the (2 * reach + 1)^2 cells around `point`, as one array."""
+        runs = [self.order[lo:hi] for lo, hi in self._point_ranges(point[0], point[1], reach)]
+        return np.concatenate(runs) if runs else np.empty(0, dtype=np.intp)
+
+    def nearest(self, point, positions, reach=1):
+        """Index of the closest agent within the (2 * reach + 1)^2 cell window, or None."""
+        candidates = self.near(point, reach)
+        if len(candidates) == 0:
+            return None
+        offsets = positions[candidates] - (point[0], point[1])
+        return int(candidates[np.argmin(np.einsum("ij,ij->i", offsets, offsets))])
+
+class NeighborList:
+    """
+    Verlet neighbor-list cache. Candidate pairs are collected out to radius + skin and reused
+    until some agent has moved farther than skin / 2 since the last build: until then no two
+    agents can have closed the skin between them, so every pair inside `radius` is still listed.
+    Callers filter the cached pairs by their exact radii each frame, as they would fresh ones.
+    """
+    def __init__(self, radius, skin, bounds):
+        self.radius = radius
+        self.skin = skin
+        self.index = CellIndex(radius + skin, bounds)
+        self.reference = None   # positions at the last build
+        self.blocks = []        # (i, j) candidate pairs, in the blocks CellIndex.pair_blocks made
+        self.hits = 0           # frames served from the cache
+        self.rebuilds = 0       # frames that had to rebuild it
+
+    def stats(self):
+        total = self.hits + self.rebuilds
+        return {"skin": self.skin, "hits": self.hits, "rebuilds": self.rebuilds,
+                "hit_rate": self.hits / total if total else 0.0}
+
+    def needs_rebuild(self, positions):
+        if self.reference is None or len(self.reference) != len(positions):
+            return True
+        moved = positions - self.reference
+        return float(np.einsum("ij,ij->i", moved, moved).max(initial=0.0)) > (self.skin * 0.5) ** 2
+
+    def update(self, positions):
+        """Returns the (i, j) candidate pair blocks for `positions`, rebuilding only when needed.
+        The kept pairs are what a Verlet list costs; the unfiltered candidates never all exist at once."""
+        if not self.needs_rebuild(positions):
+            self.hits += 1
+            return self.blocks
+
+        self.rebuilds += 1
+        self.index.update(positions)
+        reach = self.radius + self.skin
+        x, y = positions[:, 0], positions[:, 1]
+        self.blocks = []
+        for i, j in self.index.pair_blocks(1):
+            dx = x.take(i) - x.take(j)
+            dy = y.take(i) - y.take(j)
+            keep = dx * dx + dy * dy < reach * reach
+            self.blocks.append((i[keep], j[keep]))
+        self.reference = positions.copy()
+        return self.blocks
+
+class DepthOrder:
+    """
+    Painter's order (ascending key, e.g. screen y) kept across frames. Agents barely move
+    between frames, so the previous permutation is almost sorted already: update() re-sorts
+    it in place of a fresh argsort, which the adaptive stable sort does in close to one pass,
+    and skips the sort entirely while nothing has swapped.
+    """
+    def __init__(self):
+        self.order = np.empty(0, dtype=np.intp)
+        self.sorted_keys = np.empty(0)
+
+    def __len__(self):
+        return len(self.order)
+
+    def update(self, keys):
+        if len(keys) != len(self.order):
+            self.order = np.argsort(keys, kind="stable")
+            self.sorted_keys = keys[self.order]
+            return self.order
+        np.take(keys, self.order, out=self.sorted_keys)
+        if len(keys) > 1 and (self.sorted_keys[1:] < self.sorted_keys[:-1]).any():
+            repair = np.argsort(self.sorted_keys, kind="stable")
+            self.order = self.order[repair]
+            np.take(keys, self.order, out=self.sorted_keys)
+        return self.order
+
+    def split(self, key):
+        """Position in `order` where an extra item with `key` goes (after equal keys)."""
+        return int(np.searchsorted(self.sorted_keys, key, side="right"))
@@ -0,0 +1,120 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+class SurfaceCache:
+    """
+    LRU of pre-rendered surfaces capped at `max_bytes` (32-bit pixels), with hit/miss counters.
+    get() returns None on a miss; the caller renders and put()s the result.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()   # key -> (value, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, surface):
+        """Stores `value` (a surface, or anything holding `surface`) and evicts the oldest to fit."""
+        size = surface.get_width() * surface.get_height() * 4
+        previous = self.entries.pop(key, None)   # A re-put replaces the entry and makes it the newest
+        if previous is not None:
+            self.bytes -= previous[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.bytes -= old_size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+class SpriteAtlas:
+    """
+    Pre-rendered frames of one species at quantized headings and tail-sway phases, so
+    drawing an agent is one blit instead of a chain of Vector2 math and polygon calls.
+    Frames are rendered on first use and kept in a SurfaceCache capped at `max_bytes`, so the
+    angular resolution can be generous without the memory growing with it.
+
+    `render(surface, center, forward, side, sway, scale, variant)` draws one frame with the
+    agent at `center`, facing `forward`, tail at sway value `sway` (-1..1).
+    `extent` is the silhouette's reach from its center at scale 1, in px.
+    """
+    def __init__(self, render, extent, headings=64, phases=16, scale=1.0, max_bytes=16 << 20):
+        self.render = render
+        self.extent = extent
+        self.headings = headings
+        self.phases = phases
+        self.frames = SurfaceCache(max_bytes)   # (variant, heading, phase) -> (surface, dx, dy)
+        self.scale = None
+        self.set_scale(scale)
+
+    def set_scale(self, scale):
+        """Changes the drawing scale; every cached frame is dropped and re-rendered on demand."""
+        if scale == self.scale: return
+        self.scale = scale
+        self.radius = int(math.ceil(self.extent * scale)) + 2
+        self.frames.clear()
+
+    def stats(self):
+        return self.frames.stats()
+
+    def quantize(self, angles, phases):
+        """Heading angles and sway phase angles (radians) -> frame indices."""
+        heading = np.rint(np.asarray(angles) * (self.headings / math.tau)).astype(np.intp) % self.headings
+        phase = np.rint(np.asarray(phases) * (self.phases / math.tau)).astype(np.intp) % self.phases
+        return heading, phase
+
+    def frame(self, heading, phase, variant=0):
+        key = (variant, heading, phase)
+        cached = self.frames.get(key)
+        if cached is not None:
+            return cached
+
+        size = self.radius * 2
+        canvas = pygame.Surface((size, size), pygame.SRCALPHA)
+        angle = heading * math.tau / self.headings
+        forward = pygame.Vector2(math.cos(angle), math.sin(angle))
+        side = pygame.Vector2(-forward.y, forward.x)
+        sway = math.sin(phase * math.tau / self.phases)
+        self.render(canvas, pygame.Vector2(self.radius, self.radius), forward, side, sway, self.scale, variant)
+
+        # Keep only the painted pixels: most headings fill a fraction of the square
+        bounds = canvas.get_bounding_rect()
+        surface = canvas.subsurface(bounds).copy()
+        cached = (surface, bounds.x - self.radius, bounds.y - self.radius)
+        self.frames.put(key, cached, surface)
+        return cached
+
+    def draw(self, screen, positions, angles, phases, variants=None):
+        """One batched `blits` call for every agent: positions (N, 2), heading/phase angles (N,)."""
+        if len(positions) == 0: return
+        heading, phase = self.quantize(angles, phases)
+        if variants is None:
+            variants = [0] * len(positions)
+        frame = self.frame
+        sequence = []
+        for (x, y), h, p, v in zip(np.asarray(positions).tolist(), heading.tolist(), phase.tolist(), variants):
+            surface, dx, dy = frame(h, p, v)
+            sequence.append((surface, (int(x) + dx, int(y) + dy)))
+        screen.blits(sequence, doreturn=False)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import checkpoint
+from headless import make_sim
+
+def state(sim):
+    """Everything a step changes that can be compared exactly."""
+    if sim.KIND == "fish":
+        agents = sim.school
+        predators = [(p.position.x, p.position.y, p.velocity.x, p.velocity.y) for p in sim.predators]
+    else:
+        agents, p = sim.birds, sim.predator
+        predators = [(p.position.x, p.position.y, p.velocity.x, p.velocity.y, p.chase_phase, sim.current_zoom)]
+    return agents.positions.copy(), agents.velocities.copy(), predators, sim.mode, sim.steps
+
+def assert_same(a, b):
+    np.testing.assert_array_equal(a[0], b[0])
+    np.testing.assert_array_equal(a[1], b[1])
+    assert a[2:] == b[2:]
+
+@pytest.mark.parametrize("skin", [0, 10])
+@pytest.mark.parametrize("kind, mode", [("fish", 2), ("bird", "HUNT")])
+def test_load_then_step_matches_save_then_step(tmp_path, kind, mode, skin):
+    path = str(tmp_path / f"{kind}.ckpt")
+    sim = make_sim(kind, 200, 640, 360, mode, skin=skin, workers=0)
+    try:
+        for _ in range(15):
+            sim.step()
+        checkpoint.save(sim, path)
+        for _ in range(10):
+            sim.step()
+        expected = state(sim)
+    finally:
+        sim.close()
+
+    resumed = checkpoint.load(path)
+    try:
+        for _ in range(10):
+            resumed.step()
+        assert_same(state(resumed), expected)
+    finally:
+        resumed.close()
+
+def test_restore_rejects_another_sim(tmp_path):
+    path = str(tmp_path / "fish.ckpt")
+    sim = make_sim("fish", 100, 640, 360, 1, skin=0, workers=0)
+    checkpoint.save(sim, path)
+    other = make_sim("fish", 120, 640, 360, 1, skin=0, workers=0)
+    with pytest.raises(ValueError):
+        checkpoint.restore(other, path)
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = str(tmp_path / "bird.ckpt")
+    sim = make_sim("bird", 100, 640, 360, "SCOUT", skin=0)
+    sim.step()
+    checkpoint.save(sim, path)
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 100)
+    with pytest.raises(ValueError):
+        checkpoint.load(path)
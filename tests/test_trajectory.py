@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from headless import make_sim
+from trajectory import DELTA_SCALE, FOOTER, TrajectoryReader, TrajectoryWriter
+
+def record(path, kind, mode, steps=40, keyframe_interval=16):
+    """Records `steps` frames and returns the (positions, velocities) the sim actually had."""
+    sim = make_sim(kind, 150, 640, 360, mode, skin=0, workers=0)
+    states = []
+    try:
+        with TrajectoryWriter(path, sim, keyframe_interval) as writer:
+            for _ in range(steps):
+                sim.step()
+                writer.record(sim)
+                agents = sim.school if kind == "fish" else sim.birds
+                states.append((agents.positions.copy(), agents.velocities.copy()))
+    finally:
+        sim.close()
+    return states
+
+def check_frame(reader, states, number):
+    frame = reader.frame(number)
+    positions, velocities = states[number]
+    # Deltas are against the decoder's own reconstruction, so the error never accumulates
+    assert np.abs(frame.positions - positions).max() <= 0.5 / DELTA_SCALE + 1e-9
+    np.testing.assert_allclose(frame.velocities, velocities, rtol=1e-2, atol=1e-2)   # float16 in delta frames
+    assert frame.number == number
+
+@pytest.mark.parametrize("kind, mode", [("fish", 2), ("bird", "HUNT")])
+def test_seek_stays_within_half_a_delta_step(tmp_path, kind, mode):
+    path = str(tmp_path / f"{kind}.traj")
+    states = record(path, kind, mode)
+    reader = TrajectoryReader(path)
+    try:
+        assert (reader.kind, reader.count, len(reader)) == (kind, 150, len(states))
+        # Backwards, across keyframes and straight on from the previous frame
+        for number in [39, 0, 17, 16, 15, 31, 32, 33, 5, 39]:
+            check_frame(reader, states, number)
+        with pytest.raises(IndexError):
+            reader.frame(len(states))
+    finally:
+        reader.close()
+
+def test_reader_without_footer(tmp_path):
+    path = str(tmp_path / "unclosed.traj")
+    states = record(path, "fish", 3)
+    with open(path, "rb") as f:
+        f.seek(-FOOTER.size, 2)
+        start, _magic = FOOTER.unpack(f.read())
+    with open(path, "r+b") as f:
+        f.truncate(start)   # What a recording that never got to close() looks like
+
+    reader = TrajectoryReader(path)
+    try:
+        assert len(reader) == len(states)
+        for number in [20, 3, 39]:
+            check_frame(reader, states, number)
+    finally:
+        reader.close()
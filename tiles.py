@@ -0,0 +1,192 @@
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from boid1 import FishSchool
+
+# Spatial domain decomposition of the fish school over worker processes.
+# The world is cut into a grid of tiles, one per worker. Every fish row lives in shared memory;
+# each step the main process files fish under the tile they are in (fish that crossed a border
+# migrate there), and every worker steers + integrates its own tile's fish, reading the fish of
+# the surrounding tiles that sit within PERCEPTION_RADIUS of its border (the ghost zone) straight
+# out of the same shared arrays. Positions and velocities are double-buffered: workers read
+# buffer `src` and write their own rows of the other one, so no tile sees a half-stepped neighbor.
+
+def tile_grid(count, width, height):
+    """cols x rows split of a width x height world into `count` tiles, picking the squarest tiles."""
+    best = None
+    for cols in range(1, count + 1):
+        if count % cols: continue
+        rows = count // cols
+        w, h = width / cols, height / rows
+        score = max(w / h, h / w)
+        if best is None or score < best[0]:
+            best = (score, cols, rows)
+    return best[1], best[2]
+
+class SharedArrays:
+    """
+    Named numpy arrays carved out of one shared_memory block.
+    `spec` is [(name, shape, dtype)]; SharedArrays(spec, name) maps an existing block (in a worker).
+    """
+    ALIGN = 64
+
+    def __init__(self, spec, name=None):
+        self.spec = spec
+        offsets, size = [], 0
+        for _, shape, dtype in spec:
+            size = -(-size // self.ALIGN) * self.ALIGN
+            offsets.append(size)
+            size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(size, 1))
+        self.arrays = {key: np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offset)
+                       for (key, shape, dtype), offset in zip(spec, offsets)}
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self, unlink=False):
+        self.arrays.clear()   # The views have to go before the mapping can close
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+# --- WORKER SIDE ---
+_worker = {}
+
+def _attach(name, spec, layout):
+    """Pool initializer: maps the shared block once per worker process."""
+    _worker["shared"] = SharedArrays(spec, name)
+    _worker["layout"] = layout
+    _worker["rng"] = np.random.default_rng()
+
+def _step_tile(task):
+    """Steers and integrates the fish of one tile; returns (owned, ghosts) counts."""
+    tile, src, mode, predator_xy, center, flee_radius, max_speed, max_force = task
+    shared = _worker["shared"]
+    cols, rows, tile_w, tile_h, width, height = _worker["layout"]
+    order, starts = shared["order"], shared["starts"]
+    owned = order[starts[tile]:starts[tile + 1]]
+    if len(owned) == 0:
+        return 0, 0
+    positions, velocities = shared[f"positions{src}"], shared[f"velocities{src}"]
+    accelerations = shared["accelerations"]
+
+    # 1. GHOST ZONE: fish of the 8 surrounding tiles within reach of this tile's border.
+    # Edge tiles reach out forever, since fish past the world edge are filed under them.
+    tx, ty = divmod(tile, rows)
+    reach = FishSchool.PERCEPTION_RADIUS
+    x0 = tx * tile_w - reach if tx > 0 else -np.inf
+    y0 = ty * tile_h - reach if ty > 0 else -np.inf
+    x1 = (tx + 1) * tile_w + reach if tx < cols - 1 else np.inf
+    y1 = (ty + 1) * tile_h + reach if ty < rows - 1 else np.inf
+    around = []
+    for nx in range(max(tx - 1, 0), min(tx + 2, cols)):
+        for ny in range(max(ty - 1, 0), min(ty + 2, rows)):
+            t = nx * rows + ny
+            if t != tile:
+                around.append(order[starts[t]:starts[t + 1]])
+    candidates = np.concatenate(around) if around else owned[:0]
+    cx, cy = positions[candidates, 0], positions[candidates, 1]
+    ghosts = candidates[(cx >= x0) & (cx < x1) & (cy >= y0) & (cy < y1)]
+
+    # 2. LOCAL WORKING SET: owned rows first, then the ghosts (read-only context)
+    members = np.concatenate((owned, ghosts))
+    count = len(owned)
+    bounds = (max(x0, 0.0), max(y0, 0.0), min(x1, width), min(y1, height))
+    local = FishSchool.view(positions[members], velocities[members], accelerations[members], bounds, _worker["rng"])
+    local.set_limits(max_speed, max_force)
+    local.steered = count   # The ghosts only steer the owned rows: no pairs of their own
+    local.find_neighbors()
+    local.steer_from(mode, predator_xy, center, flee_radius)
+
+    # 3. INTEGRATE the owned rows only and write them into the other buffer
+    stepped = FishSchool.view(local.positions[:count], local.velocities[:count], local.accelerations[:count], bounds)
+    stepped.set_limits(max_speed, max_force)
+    stepped.integrate(width, height)
+    shared[f"positions{1 - src}"][owned] = stepped.positions
+    shared[f"velocities{1 - src}"][owned] = stepped.velocities
+    accelerations[owned] = 0.0
+    return count, len(ghosts)
+
+# --- MAIN PROCESS SIDE ---
+class TiledSchool(FishSchool):
+    """
+    FishSchool whose steering and integration run in a pool of `workers` processes, one world
+    tile each, on shared-memory state. Everything else (drawing, water drag, the sharks' hunt)
+    keeps using the school from the main process as before.
+    find_neighbors() files the fish under their tiles, steer() runs every tile in parallel
+    (integration included), integrate() is then a no-op. Call close() when done with it.
+    """
+    def __init__(self, count, width, height, workers, tiles=None):
+        super().__init__(count, width, height)
+        self.width, self.height = width, height
+        self.tiles = tiles or workers
+        self.cols, self.rows = tile_grid(self.tiles, width, height)
+        self.tile_w, self.tile_h = width / self.cols, height / self.rows
+        spec = [("positions0", (count, 2), np.float64), ("positions1", (count, 2), np.float64),
+                ("velocities0", (count, 2), np.float64), ("velocities1", (count, 2), np.float64),
+                ("accelerations", (count, 2), np.float64),
+                ("order", (count,), np.intp), ("starts", (self.tiles + 1,), np.intp)]
+        self.shared = SharedArrays(spec)
+        self.shared["positions0"][:] = self.positions
+        self.shared["velocities0"][:] = self.velocities
+        self.shared["accelerations"][:] = 0.0
+        self.src = 0
+        self._bind()
+        self.tile_ids = None
+        self.migrations = 0   # Fish that changed tile over the whole run
+        self.ghosts = 0       # Ghost rows read in the last step, summed over tiles
+
+        layout = (self.cols, self.rows, self.tile_w, self.tile_h, width, height)
+        self.pool = multiprocessing.get_context().Pool(workers, initializer=_attach,
+                                                       initargs=(self.shared.name, spec, layout))
+
+    def _bind(self):
+        self.positions = self.shared[f"positions{self.src}"]
+        self.velocities = self.shared[f"velocities{self.src}"]
+        self.accelerations = self.shared["accelerations"]
+
+    def find_neighbors(self):
+        """Files every fish under the tile it is in now: fish that crossed a border migrate here."""
+        tx = np.clip((self.positions[:, 0] // self.tile_w).astype(np.intp), 0, self.cols - 1)
+        ty = np.clip((self.positions[:, 1] // self.tile_h).astype(np.intp), 0, self.rows - 1)
+        tile_ids = (tx * self.rows + ty).astype(np.uint16)
+        if self.tile_ids is not None:
+            self.migrations += int(np.count_nonzero(tile_ids != self.tile_ids))
+        self.tile_ids = tile_ids
+        self.shared["order"][:] = np.argsort(tile_ids, kind="stable")
+        np.cumsum(np.bincount(tile_ids, minlength=self.tiles), out=self.shared["starts"][1:])
+        self.shared["starts"][0] = 0
+
+    def steer(self, mode, predators, center, flee_radius):
+        """Steers and integrates every tile in the worker pool, then flips to the new buffers."""
+        predator_xy = [(p.position.x, p.position.y) for p in predators]
+        tasks = [(tile, self.src, mode, predator_xy, center, flee_radius,
+                  self.max_speed, self.max_force) for tile in range(self.tiles)]
+        counts = self.pool.map(_step_tile, tasks)
+        self.ghosts = sum(ghosts for _, ghosts in counts)
+        self.src = 1 - self.src
+        self._bind()
+
+    def integrate(self, width, height):
+        """Already done by the workers in steer()."""
+
+    def stats(self):
+        return {"tiles": self.tiles, "layout": [self.cols, self.rows], "ghosts": self.ghosts,
+                "migrations": self.migrations}
+
+    def close(self):
+        if self.pool is None: return
+        self.pool.close()
+        self.pool.join()
+        self.pool = None
+        # Keep private copies so the school stays readable after the shared block is gone
+        self.positions, self.velocities = self.positions.copy(), self.velocities.copy()
+        self.accelerations = self.accelerations.copy()
+        self.shared.close(unlink=True)
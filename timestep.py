@@ -0,0 +1,46 @@
+import time
+
+class FixedTimestep:
+    """
+    Fixed-rate simulation clock for a variable-rate render loop (the accumulator pattern).
+    Every frame, advance() banks the wall time since the previous call and returns how many
+    1/rate-second steps are due; `alpha` is then how far the frame falls between the last two
+    simulated states, for the renderer to interpolate.
+
+    At most `max_steps` run per frame. Beyond that the backlog is dropped (and counted), so a
+    stall slows the simulation for a moment instead of spiralling into ever longer catch-up frames.
+    """
+    def __init__(self, rate, max_steps=4, clock=time.perf_counter):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.steps = 0
+        self.dropped = 0
+        self._last = None
+
+    def reset(self):
+        """Forgets the time banked so far; the next advance() starts fresh with one step."""
+        self.accumulator = 0.0
+        self._last = None
+
+    def advance(self):
+        now = self.clock()
+        if self._last is None:
+            self.accumulator = self.dt   # First frame: one step, no history to catch up on
+        else:
+            self.accumulator += now - self._last
+        self._last = now
+
+        due = int(self.accumulator / self.dt)
+        if due > self.max_steps:
+            self.dropped += due - self.max_steps
+            due = self.max_steps
+            self.accumulator = self.dt * due + self.accumulator % self.dt
+        self.accumulator -= due * self.dt
+        self.steps += due
+        return due
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
@@ -0,0 +1,250 @@
+import mmap
+import struct
+
+import numpy as np
+
+# Append-only trajectory files: every agent's position and velocity plus the predators' state
+# flags for each recorded step, readable through a memory map with O(1) seeking.
+#
+#   file    = header, static block, frame*, [index footer]
+#   header  = FILE_HEADER (magic "BIOSIMTR", version, kind, agents, width, height, keyframe interval)
+#   static  = per-agent constants the drawing needs (fish: sway offset + speed, birds: flap speed)
+#   frame   = FRAME_HEADER, agents, PREDATOR * predators
+#             keyframe: float32 positions (N, 2) + float32 velocities (N, 2)
+#             delta:    int16 position steps in 1/DELTA_SCALE px (N, 2) + float16 velocities (N, 2)
+#   footer  = INDEX entry per frame (byte offset + keyframe flag), then struct "<Q4s" (start, b"TIDX")
+#
+# Deltas are taken against the decoder's own reconstruction of the previous frame, so rounding
+# never accumulates: every replayed position is within 0.5 / DELTA_SCALE px of the recorded one.
+# A keyframe is written every `keyframe_interval` frames (and whenever a step is too long for
+# int16), so seeking decodes at most that many frames. Files that were never closed (no footer)
+# are indexed by walking the frame headers.
+
+MAGIC = b"BIOSIMTR"
+VERSION = 1
+DELTA_SCALE = 256.0
+KINDS = ("fish", "bird")
+FISH_MODES = (1, 2, 3)
+BIRD_MODES = ("SCOUT", "HUNT")
+CHASE_PHASES = ("ORBIT", "INTERCEPT", "TETHERED", "IDLE")
+BURSTING, SWOOPING, GLIDING = 1, 2, 4
+
+FILE_HEADER = np.dtype([("magic", "S8"), ("version", "<u2"), ("kind", "u1"), ("pad", "u1"), ("agents", "<u4"),
+                        ("width", "<u4"), ("height", "<u4"), ("keyframe_interval", "<u4")])
+FRAME_HEADER = np.dtype([("frame", "<u4"), ("size", "<u4"), ("keyframe", "u1"), ("mode", "u1"),
+                         ("predators", "<u2"), ("zoom", "<f4"), ("target", "<i4")])
+PREDATOR = np.dtype([("x", "<f4"), ("y", "<f4"), ("vx", "<f4"), ("vy", "<f4"),
+                     ("flags", "u1"), ("phase", "u1"), ("pad", "<u2")])
+INDEX = np.dtype([("offset", "<u8"), ("keyframe", "u1")])
+FOOTER = struct.Struct("<Q4s")
+FOOTER_MAGIC = b"TIDX"
+
+def _static_arrays(sim):
+    if sim.KIND == "fish":
+        return [sim.school.sway_offset, sim.school.sway_speed]
+    return [sim.birds.flap_speed]
+
+def capture(sim):
+    """(positions, velocities, frame header fields, predator records) of a FishSim/BirdSim."""
+    if sim.KIND == "fish":
+        positions, velocities = sim.school.positions, sim.school.velocities
+        predators = np.array([(p.position.x, p.position.y, p.velocity.x, p.velocity.y,
+                               BURSTING if p.is_bursting else 0, 0, 0) for p in sim.predators], dtype=PREDATOR)
+        fields = (FISH_MODES.index(sim.mode), 1.0, -1)
+    else:
+        positions, velocities = sim.birds.positions, sim.birds.velocities
+        p = sim.predator
+        flags = (SWOOPING if p.is_swooping else 0) | (GLIDING if p.is_gliding else 0)
+        phase = CHASE_PHASES.index(getattr(p, "chase_phase", "ORBIT"))   # Set by the first update()
+        predators = np.array([(p.position.x, p.position.y, p.velocity.x, p.velocity.y, flags, phase, 0)], dtype=PREDATOR)
+        target = -1 if p.target_bird is None else int(p.target_bird)
+        fields = (BIRD_MODES.index(sim.mode), sim.current_zoom, target)
+    return positions, velocities, fields, predators
+
+class TrajectoryWriter:
+    """
+    Appends one frame per record(sim) call. Use as a context manager (or close()) so the seek
+    index gets written; without it the file is still readable, just slower to open.
+    """
+    def __init__(self, path, sim, keyframe_interval=60):
+        self.path = path
+        self.kind = sim.KIND
+        self.keyframe_interval = keyframe_interval
+        self.frames = 0
+        self.index = []          # (offset, keyframe) per frame
+        self.recon = None        # Decoder-side positions of the last frame (float64)
+        self.count = len(capture(sim)[0])
+
+        self.file = open(path, "wb")
+        header = np.zeros((), FILE_HEADER)
+        header["magic"], header["version"], header["kind"] = MAGIC, VERSION, KINDS.index(self.kind)
+        header["agents"], header["width"], header["height"] = self.count, sim.width, sim.height
+        header["keyframe_interval"] = keyframe_interval
+        self.file.write(header.tobytes())
+        for array in _static_arrays(sim):
+            self.file.write(np.asarray(array, dtype="<f4").tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, sim):
+        positions, velocities, (mode, zoom, target), predators = capture(sim)
+        keyframe = self.recon is None or self.frames % self.keyframe_interval == 0
+        if not keyframe:
+            steps = np.rint((positions - self.recon) * DELTA_SCALE)
+            keyframe = bool(np.abs(steps).max(initial=0) > 32767)   # A jump too long for int16
+        if keyframe:
+            body = positions.astype("<f4")
+            self.recon = body.astype(np.float64)
+            agents = body.tobytes() + velocities.astype("<f4").tobytes()
+        else:
+            steps = steps.astype("<i2")
+            self.recon += steps / DELTA_SCALE
+            agents = steps.tobytes() + velocities.astype("<f2").tobytes()
+
+        header = np.zeros((), FRAME_HEADER)
+        header["frame"], header["keyframe"], header["mode"] = self.frames, keyframe, mode
+        header["predators"], header["zoom"], header["target"] = len(predators), zoom, target
+        header["size"] = FRAME_HEADER.itemsize + len(agents) + predators.nbytes
+        self.index.append((self.file.tell(), keyframe))
+        self.file.write(header.tobytes())
+        self.file.write(agents)
+        self.file.write(predators.tobytes())
+        self.frames += 1
+
+    def close(self):
+        if self.file.closed: return
+        start = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX).tobytes())
+        self.file.write(FOOTER.pack(start, FOOTER_MAGIC))
+        self.file.close()
+
+class Frame:
+    """One decoded frame. Its arrays belong to the reader and are overwritten by the next read."""
+    __slots__ = ("number", "mode", "zoom", "target", "positions", "velocities", "predators")
+
+class TrajectoryReader:
+    """
+    Memory-mapped random access to a trajectory file: frame(i) decodes from the nearest
+    keyframe at or before i, or straight on from the previous frame when playing forward,
+    into buffers that are reused, so memory stays constant however long the recording is.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = np.frombuffer(self.map, FILE_HEADER, count=1)[0]
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{path}: not a version {VERSION} trajectory file")
+        self.kind = KINDS[header["kind"]]
+        self.count = int(header["agents"])
+        self.width, self.height = int(header["width"]), int(header["height"])
+        self.keyframe_interval = int(header["keyframe_interval"])
+
+        offset = FILE_HEADER.itemsize
+        self.static = []
+        for _ in range(2 if self.kind == "fish" else 1):
+            self.static.append(np.frombuffer(self.map, "<f4", self.count, offset))
+            offset += 4 * self.count
+        self.index = self._read_index(offset)
+        self.keyframes = np.flatnonzero(self.index["keyframe"])
+
+        self.current = -1
+        self.recon = np.zeros((self.count, 2))
+        self.velocities = np.zeros((self.count, 2))
+
+    def _read_index(self, first):
+        size = len(self.map)
+        if size >= first + FOOTER.size:
+            start, magic = FOOTER.unpack_from(self.map, size - FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                count = (size - FOOTER.size - start) // INDEX.itemsize
+                return np.frombuffer(self.map, INDEX, count, start)
+        # No footer (the recording didn't close): walk the frame headers
+        entries, offset = [], first
+        while offset + FRAME_HEADER.itemsize <= size:
+            header = np.frombuffer(self.map, FRAME_HEADER, 1, offset)[0]
+            if header["frame"] != len(entries) or header["size"] == 0 or offset + header["size"] > size: break
+            entries.append((offset, header["keyframe"]))
+            offset += int(header["size"])
+        return np.array(entries, dtype=INDEX)
+
+    def __len__(self):
+        return len(self.index)
+
+    def close(self):
+        self.static = self.index = None   # Views into the map must go before it can close
+        self.map.close()
+        self.file.close()
+
+    def _decode(self, number):
+        offset = int(self.index["offset"][number])
+        header = np.frombuffer(self.map, FRAME_HEADER, 1, offset)[0]
+        offset += FRAME_HEADER.itemsize
+        n = self.count
+        if header["keyframe"]:
+            self.recon[:] = np.frombuffer(self.map, "<f4", 2 * n, offset).reshape(n, 2)
+            self.velocities[:] = np.frombuffer(self.map, "<f4", 2 * n, offset + 8 * n).reshape(n, 2)
+            offset += 16 * n
+        else:
+            self.recon += np.frombuffer(self.map, "<i2", 2 * n, offset).reshape(n, 2) / DELTA_SCALE
+            self.velocities[:] = np.frombuffer(self.map, "<f2", 2 * n, offset + 4 * n).reshape(n, 2)
+            offset += 8 * n
+        self.current = number
+        # A few bytes: copied, so no frame keeps the map pinned once the reader is closed
+        return header, np.frombuffer(self.map, PREDATOR, int(header["predators"]), offset).copy()
+
+    def frame(self, number):
+        if not 0 <= number < len(self):
+            raise IndexError(f"frame {number} out of range (0..{len(self) - 1})")
+        if self.current < number and not self.index["keyframe"][self.current + 1:number + 1].any():
+            start = self.current + 1   # Playing forward: just the deltas since the last read
+        else:
+            start = int(self.keyframes[np.searchsorted(self.keyframes, number, side="right") - 1])
+        for i in range(start, number + 1):
+            header, predators = self._decode(i)
+
+        frame = Frame()
+        frame.number = number
+        frame.mode = (FISH_MODES if self.kind == "fish" else BIRD_MODES)[header["mode"]]
+        frame.zoom, frame.target = float(header["zoom"]), int(header["target"])
+        frame.positions, frame.velocities, frame.predators = self.recon, self.velocities, predators
+        return frame
+
+    def make_sim(self):
+        """A never-stepped FishSim/BirdSim of the recorded size to draw replayed frames with."""
+        from simulation import FishSim, BirdSim
+        if self.kind == "fish":
+            sim = FishSim(self.width, self.height, self.count, skin=0, workers=0)
+            sim.school.sway_offset, sim.school.sway_speed = (a.astype(np.float64) for a in self.static)
+        else:
+            sim = BirdSim(self.width, self.height, self.count, skin=0)
+            sim.birds.flap_speed = self.static[0].astype(np.float64)
+        return sim
+
+    def apply(self, frame, sim):
+        """Puts a decoded frame into `sim` (from make_sim()) so that sim.draw() shows it."""
+        sim.previous = None
+        sim.steps = frame.number + 1   # Animation clock from the start of the recording
+        if self.kind == "fish":
+            from boid1 import PredatorFish
+            sim.mode = frame.mode
+            sim.school.positions, sim.school.velocities = frame.positions, frame.velocities
+            if len(sim.predators) != len(frame.predators):
+                sim.predators = [PredatorFish(0, 0) for _ in frame.predators]
+            for p, record in zip(sim.predators, frame.predators):
+                p.position.update(float(record["x"]), float(record["y"]))
+                p.velocity.update(float(record["vx"]), float(record["vy"]))
+                p.is_bursting = bool(record["flags"] & BURSTING)
+        else:
+            sim.mode, sim.current_zoom = frame.mode, frame.zoom
+            sim.birds.positions, sim.birds.velocities = frame.positions, frame.velocities
+            p, record = sim.predator, frame.predators[0]
+            p.position.update(float(record["x"]), float(record["y"]))
+            p.velocity.update(float(record["vx"]), float(record["vy"]))
+            p.is_swooping = bool(record["flags"] & SWOOPING)
+            p.is_gliding = bool(record["flags"] & GLIDING)
+            p.chase_phase = CHASE_PHASES[record["phase"]]
+            p.target_bird = None if frame.target < 0 else frame.target
@@ -0,0 +1,32 @@
+import numpy as np
+
+# Batched versions of the Vector2 helpers the boids lean on (normalize, scale_to_length...)
+# Every function works on (N, 2) float arrays, one row per agent.
+
+def lengths(vectors):
+    return np.hypot(vectors[:, 0], vectors[:, 1])
+
+def clamp_length(vectors, limit):
+    """Scales every row longer than `limit` back down to exactly `limit` (in place).
+    `limit` can be one number for everybody or one number per row."""
+    length = lengths(vectors)
+    limit = np.broadcast_to(limit, length.shape)
+    too_long = length > limit
+    vectors[too_long] *= (limit[too_long] / length[too_long])[:, None]
+    return vectors
+
+def normalized(vectors, eps=0.001):
+    """Unit vectors; rows shorter than `eps` come back as (0, 0) instead of crashing like normalize()."""
+    length = lengths(vectors)
+    ok = length > eps
+    out = np.zeros_like(vectors)
+    out[ok] = vectors[ok] / length[ok, None]
+    return out
+
+def steer(desired, active, velocities, max_speed, max_force):
+    """Batched 'scale desired to max_speed, subtract velocity, clamp to max_force'."""
+    length = lengths(desired)
+    active = active & (length > 0)
+    steering = np.zeros_like(desired)
+    steering[active] = desired[active] / length[active, None] * max_speed - velocities[active]
+    return clamp_length(steering, max_force)